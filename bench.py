@@ -0,0 +1,514 @@
+"""
+Micro-Benchmarks für scrape_build.py auf synthetischen Unterstützer-Seiten.
+
+    python bench.py                 # alle Benchmarks
+    python bench.py decode          # nur einzelne
+"""
+import http.server
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import requests
+from bs4 import BeautifulSoup
+
+import scrape_build as sb
+
+
+def synthetic_page(n: int) -> str:
+    """Seite im Aufbau der Webador-Quelle: Logo, h3, Branche, Link pro Block."""
+    parts = [
+        "<!doctype html><html><head><meta charset=\"utf-8\"><title>Unterstützer</title></head><body>",
+        "<header><img src=\"/site-logo.png\"><nav><a href=\"/\">Start</a></nav></header>",
+    ]
+    for i in range(n):
+        parts.append(
+            f"<div class=\"blk\"><div><img src=\"/logos/{i}.png\"></div>"
+            f"<h3><span>Müller Öko Straße {i} GmbH</span>\xa0</h3>"
+            f"<p>Branche: <strong>Handel {i % 17}</strong></p>"
+            f"<p><a href=\"https://firma{i}.example.at/\">https://firma{i}.example.at/</a></p></div>"
+        )
+    parts.append("<h3>ÜBER INITIATIVE ÖSTERREICH 2040</h3><p>Footer</p></body></html>")
+    return "".join(parts)
+
+
+def legacy_blocks(soup):
+    """Die frühere Variante: pro h3 eine Rückwärts- und eine Vorwärts-Suche."""
+    blocks = []
+    for h in soup.find_all("h3"):
+        logo = None
+        for el in h.previous_elements:
+            if getattr(el, "name", None) == "h3":
+                break
+            if getattr(el, "name", None) == "img" and el.get("src"):
+                logo = sb.urljoin(sb.BASE, el.get("src"))
+                break
+        texts, link = [], None
+        for el in h.next_elements:
+            if getattr(el, "name", None) == "h3":
+                break
+            if link is None and getattr(el, "name", None) == "a":
+                href = el.get("href", "").strip()
+                if href.startswith("http://") or href.startswith("https://"):
+                    link = href
+            if isinstance(el, str):
+                t = el.strip().replace("\xa0", " ")
+                if t:
+                    texts.append(t)
+        blocks.append([h, logo, link, texts])
+    return blocks
+
+
+def timeit(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def report(label: str, seconds: float) -> None:
+    print(f"  {label:<52} {seconds * 1000:10.1f} ms")
+
+
+# -----------------------------
+# Benchmarks
+# -----------------------------
+
+def bench_decode():
+    """r.text + str-Parsing vs. Bytes direkt an lxml (Server ohne charset)."""
+    print("decode: text path vs. bytes-first")
+    for n in (1_000, 10_000):
+        body = synthetic_page(n).encode("utf-8")
+
+        def text_path():
+            r = requests.models.Response()
+            r._content = body
+            r.encoding = None
+            sb.extract_entries(r.text)
+
+        def bytes_path():
+            sb.extract_entries(body, sb.declared_charset("text/html"))
+
+        report(f"{n} entries, r.text", timeit(text_path))
+        report(f"{n} entries, bytes", timeit(bytes_path))
+
+
+def bench_segment():
+    """Per-h3-Walks vs. Single-Pass-Segmentierung (ohne Parse-Zeit)."""
+    print("segment: legacy walks vs. single pass")
+    # Ohne Logo vor dem ersten h3 läuft die Rückwärtssuche bis zum Dokumentanfang
+    header = "<div>" + "<p><span>Menü</span> Text</p>" * 50_000 + "</div>"
+    no_logo = (synthetic_page(1_000)
+               .replace("<img src=\"/site-logo.png\">", header)
+               .replace("<img src=\"/logos/0.png\">", ""))
+    cases = [(f"{n} entries", synthetic_page(n)) for n in (1_000, 10_000)]
+    cases.append(("1000 entries, 50k nodes before 1st h3", no_logo))
+    for label, html in cases:
+        soup = BeautifulSoup(html, "lxml")
+        assert [b[1:] for b in legacy_blocks(soup)] == [b[1:] for b in sb.segment_blocks(soup)]
+        report(f"{label}, legacy", timeit(lambda: legacy_blocks(soup)))
+        report(f"{label}, single pass", timeit(lambda: sb.segment_blocks(soup)))
+
+
+def bench_parser():
+    """Ganze Extraktion: BeautifulSoup-Backend vs. lxml.html direkt."""
+    print("parser: bs4 vs. lxml backend (parse + extract)")
+    for n in (1_000, 10_000):
+        body = synthetic_page(n).encode("utf-8")
+        assert sb.extract_entries(body, parser="bs4") == sb.extract_entries(body, parser="lxml")
+        for parser in sb.PARSERS:
+            report(f"{n} entries, {parser}", timeit(lambda: sb.extract_entries(body, parser=parser)))
+
+
+def bench_workers():
+    """Skalierung von extract_all mit 1/2/4/8 Prozessen: eine große Seite (h3-Bereiche) vs. 16 Quellen."""
+    print(f"workers: process-pool extraction ({os.cpu_count()} CPUs)")
+    big = [(synthetic_page(40_000).encode("utf-8"), None)]
+    many = [(synthetic_page(2_500).replace(" GmbH", f" {s} GmbH").encode("utf-8"), None) for s in range(16)]
+    for label, pages in (("1 page x 40k", big), ("16 pages x 2.5k", many)):
+        base = None
+        for workers in (1, 2, 4, 8):
+            sec = timeit(lambda: sb.extract_all(pages, parser="lxml", workers=workers), repeat=1)
+            base = base or sec
+            report(f"{label}, {workers} workers (x{base / sec:.2f})", sec)
+
+
+def legacy_build_html(entries):
+    """Die frühere Variante: sechs esc_attr pro Karte, Karten-Join im großen f-String."""
+    cards = []
+    for e in entries:
+        branche_val, url_val, logo = e.branche or "", e.url or "", e.logo or ""
+        branche_text = f"Branche: {branche_val}" if branche_val else ""
+        cards.append(f"""
+        <a class="card"
+           href="{sb.esc_attr(url_val) or '#'}"
+           target="_blank"
+           rel="noopener"
+           data-name="{sb.esc_attr(e.name)}"
+           data-branche="{sb.esc_attr(branche_val)}"
+           data-url="{sb.esc_attr(url_val)}">
+          <div class="logoWrap">
+            <img src="{sb.esc_attr(logo)}" alt="{sb.esc_attr(e.name)}" loading="lazy" decoding="async">
+          </div>
+          <div class="name">{sb.esc_attr(e.name)}</div>
+          <div class="meta">{sb.esc_attr(branche_text)}</div>
+          <div class="url">{sb.esc_attr(url_val)}</div>
+        </a>
+        """)
+    return f"""{sb._PAGE_HEAD}{''.join(cards)}{sb._PAGE_MID}{len(entries)}{sb._PAGE_END}"""
+
+
+def synthetic_entries(n: int):
+    return [
+        sb.Entry(f"Müller & Söhne {i} GmbH", f"Handel {i % 17}" if i % 3 else None,
+                 f"https://firma{i}.example.at/?a=1&b=2", f"https://cdn.example.at/logos/{i}.png", f"mueller {i}")
+        for i in range(n)
+    ]
+
+
+def bench_render():
+    """build_html bei 1k/100k/1M Karten: f-String pro Karte + großer f-String vs. vorkompilierte Stücke."""
+    print("render: build_html")
+    for n in (1_000, 100_000, 1_000_000):
+        entries = synthetic_entries(n)
+        if n == 1_000:
+            assert legacy_build_html(entries) == sb.build_html(entries)
+        repeat = 3 if n < 1_000_000 else 1
+        report(f"{n} cards, legacy", timeit(lambda: legacy_build_html(entries), repeat=repeat))
+        report(f"{n} cards, render_card + single join", timeit(lambda: sb.build_html(entries), repeat=repeat))
+
+
+def bench_render_memory():
+    """Spitzenspeicher beim Schreiben von 100k/400k Karten: build_html + write vs. write_html."""
+    print("render_memory: peak Python heap (tracemalloc), entries excluded")
+    path = os.path.join(tempfile.mkdtemp(), "index.html")
+    for n in (100_000, 400_000):
+        entries = synthetic_entries(n)
+
+        def whole():
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(sb.build_html(entries))
+
+        for label, fn in (("build_html + write", whole), ("write_html", lambda: sb.write_html(entries, path))):
+            print(f"  {n} cards, {label:<40} {peak_mib(fn):10.1f} MiB")
+        report(f"{n} cards, build_html + write", timeit(whole, repeat=1))
+        report(f"{n} cards, write_html", timeit(lambda: sb.write_html(entries, path), repeat=1))
+
+
+# Adversariale Seiten: Name -> (Generator, Zeitschranke in s für die Extraktion,
+# erwartete Zahl Einträge). Die Zahl gehört dazu: "schnell", weil nichts
+# extrahiert wurde, ist kein Bestehen.
+ADVERSARIAL = {
+    "50k images, no h3": (
+        lambda: "<html><body>" + "<div><img src=\"/i.png\"></div>" * 50_000 + "</body></html>", 4.0, 0),
+    "100k nodes before 1st h3": (
+        lambda: "<html><body>" + "<div><span>x</span></div>" * 50_000 + synthetic_page(100)[150:], 4.0, 100),
+    "100k nodes after last h3": (
+        lambda: synthetic_page(100).replace("<p>Footer</p>", "<p><b>x</b> y</p>" * 50_000), 4.0, 100),
+    "one h3, 100k text nodes": (
+        lambda: ("<html><body><h3>Riesenblock</h3>"
+                 + "<p>Branche: x</p><span>y</span>" * 50_000 + "</body></html>"), 4.0, 1),
+    "depth 20k, unclosed div": (
+        lambda: "<html><body>" + "<div>" * 20_000 + "<img src=\"/l.png\"><h3>Tief GmbH</h3>Branche: Bau", 4.0, 1),
+    "20k unclosed links": (
+        lambda: "<html><body><h3>Links</h3>" + "<a href=\"https://x.example/\">x" * 20_000, 4.0, 1),
+    "50k empty h3": (
+        lambda: "<html><body>" + "<h3></h3>" * 50_000 + "</body></html>", 4.0, 0),
+    "5 MB text node without URL": (
+        lambda: "<html><body><img src=\"/l.png\"><h3>Text GmbH</h3><p>Branche: " + "Bau " * 1_250_000 + "</p>",
+        4.0, 1),
+    "1k '<h3' in comments": (
+        lambda: synthetic_page(1_000).replace("<h3>", "<!-- <h3> --><h3>"), 4.0, 1_000),
+}
+
+
+def stream_entries(body: bytes):
+    """Einträge wie extract_entries, aber über StreamExtractor in STREAM_CHUNK_SIZE-Stücken."""
+    sx = sb.StreamExtractor()
+    sx.begin(None)
+    for i in range(0, len(body), sb.STREAM_CHUNK_SIZE):
+        sx.feed(body[i:i + sb.STREAM_CHUNK_SIZE])
+    return sb.dedup_and_sort(sx.close())
+
+
+def bench_adversarial():
+    """
+    Pathologische Seiten: Extraktion pro Backend (und im Stream) muss unter
+    der festen Schranke bleiben, die erwartete Zahl Einträge liefern und mit
+    bs4 übereinstimmen.
+    """
+    print(f"adversarial: pathological pages (limits: {sb.BLOCK_MAX_NODES} nodes, {sb.BLOCK_MAX_TEXTS} texts per block)")
+    failed = []
+    for label, (make, bound, expected) in ADVERSARIAL.items():
+        body = make().encode("utf-8")
+        runs = {p: (lambda p=p: sb.extract_entries(body, parser=p)) for p in sb.PARSERS}   # bs4 zuerst
+        runs["stream"] = lambda: stream_entries(body)
+        results = {}
+        for parser, fn in runs.items():
+            t0 = time.perf_counter()
+            results[parser] = [e.row() for e in fn()]
+            sec = time.perf_counter() - t0
+            report(f"{label}, {parser} ({len(results[parser])} entries)", sec)
+            if sec > bound:
+                failed.append(f"{label} ({parser}): {sec:.2f}s > {bound}s")
+            if len(results[parser]) != expected:
+                failed.append(f"{label} ({parser}): {len(results[parser])} entries, expected {expected}")
+            elif results[parser] != results["bs4"]:
+                failed.append(f"{label} ({parser}): entries differ from bs4")
+
+    # Budget: eine große Seite mit winzigem Budget muss schnell und klar scheitern
+    body = synthetic_page(20_000).encode("utf-8")
+    budget, sb.EXTRACT_BUDGET = sb.EXTRACT_BUDGET, 0.05
+    try:
+        t0 = time.perf_counter()
+        sb.extract_entries(body, parser="lxml")
+        failed.append("budget: no ExtractBudgetExceeded")
+    except sb.ExtractBudgetExceeded as e:
+        sec = time.perf_counter() - t0
+        report(f"budget 50 ms, 20k entries -> {type(e).__name__}", sec)
+        if sec > 1.0:
+            failed.append(f"budget: took {sec:.2f}s to fail")
+    finally:
+        sb.EXTRACT_BUDGET = budget
+
+    assert not failed, "adversarial checks failed:\n  " + "\n  ".join(failed)
+
+
+def peak_mib(fn) -> float:
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 2**20
+
+
+def bench_stream():
+    """Spitzenspeicher: ganzes Dokument parsen vs. StreamExtractor in 64-KiB-Chunks."""
+    print("stream: peak Python heap (tracemalloc, ohne libxml2-intern), body excluded")
+    for n in (5_000, 20_000):
+        body = synthetic_page(n).encode("utf-8")
+
+        def streamed():
+            sx = sb.StreamExtractor(on_entry=lambda e: None)
+            sx.begin("utf-8")
+            for i in range(0, len(body), sb.STREAM_CHUNK_SIZE):
+                sx.feed(body[i:i + sb.STREAM_CHUNK_SIZE])
+            sx.close()
+
+        for label, fn in (
+            ("bs4", lambda: sb.scan_page(body, parser="bs4")),
+            ("lxml", lambda: sb.scan_page(body, parser="lxml")),
+            ("stream", streamed),
+        ):
+            print(f"  {n} entries, {label:<38} {peak_mib(fn):10.1f} MiB")
+
+
+def bench_parsecache():
+    """Kalte Extraktion vs. Treffer im Ergebnis-Cache (gleiches HTML)."""
+    print("parsecache: scan_page vs. cached load")
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        sb.PARSE_CACHE_DIR = tmp
+        sb.PARSE_CACHE_ENABLED = True
+        for n in (300, 10_000):
+            body = synthetic_page(n).encode("utf-8")
+            sb.scan_page_cached(body)   # füllt den Cache
+            report(f"{n} entries, parse (lxml)", timeit(lambda: sb.scan_page(body, parser="lxml")))
+            report(f"{n} entries, cached", timeit(lambda: sb.scan_page_cached(body)))
+        sb.PARSE_CACHE_ENABLED = False
+
+
+def legacy_branche(texts):
+    """Die frühere Variante: ganzen Blocktext bauen, dann Regex."""
+    block_text = re.sub(r"\s+", " ", " ".join(texts)).strip()
+    m = re.search(r"\bBranche\s*:\s*(.+?)(?=(?:\shttps?://)|$)", block_text, flags=re.IGNORECASE)
+    return (m.group(1).strip() or None) if m else None
+
+
+def bench_branche():
+    """Branche pro Eintrag bei 100k Blöcken: Join + Regex vs. find_branche."""
+    print("branche: per-entry cost at 100k entries")
+    n = 100_000
+    blocks = []
+    for i in range(n):
+        texts = [f"Muster {i} GmbH", "Branche:", f"Handel und  Gewerbe {i % 17}", f"https://firma{i}.example.at/"]
+        if i % 5 == 0:
+            texts = texts[:1] + [f"Seit {1990 + i % 30} in Wien tätig."] * 6 + texts[1:]
+        if i % 7 == 0:
+            texts = [t for t in texts if t != "Branche:"]
+        blocks.append(texts)
+    assert [legacy_branche(t) for t in blocks] == [sb.find_branche(t) for t in blocks]
+    for label, fn in (("join + regex", legacy_branche), ("find_branche", sb.find_branche)):
+        sec = timeit(lambda: [fn(t) for t in blocks])
+        print(f"  {label:<40} {sec * 1000:10.1f} ms  {sec / n * 1e6:6.2f} µs/entry")
+
+
+def legacy_sort_key(name):
+    """Die frühere Variante: vier .replace-Aufrufe plus Regex."""
+    s = name.strip().lower()
+    s = s.replace("ä", "ae").replace("ö", "oe").replace("ü", "ue").replace("ß", "ss")
+    return re.sub(r"\s+", " ", s)
+
+
+def bench_normalize():
+    """normalize_sort_key über 200k Namen: alte replace-Kette + Regex vs. FOLD_MAP (kalt und memoisiert)."""
+    print("normalize: sort key folding")
+    rng = random.Random(3)
+    words = ["Bäckerei", "Größe", "Müller", "Straße", "Holz", "Technik", "Österreich", "Wien"]
+    names = [f"  {rng.choice(words)}  {rng.choice(words)} {i} GmbH " for i in range(200_000)]
+    assert all(legacy_sort_key(n) == sb.normalize_sort_key(n) for n in names[:1000])
+    report("replace chain + regex", timeit(lambda: [legacy_sort_key(n) for n in names]))
+    report("fold table, cold", timeit(lambda: [sb.normalize_sort_key.__wrapped__(n) for n in names]))
+    for n in names[:50_000]:
+        sb.normalize_sort_key(n)
+    report("fold table, memoized (50k distinct, warm)",
+           timeit(lambda: [sb.normalize_sort_key(n) for n in names[:50_000]]))
+
+
+def bench_entry_memory():
+    """Container-Kosten pro Eintrag bei 1M Einträgen: dict vs. Entry (__slots__)."""
+    print("entry_memory: bytes per entry at 1M entries (strings excluded)")
+    n = 1_000_000
+    # Strings vorab anlegen, damit nur der Container gemessen wird
+    names = [f"Muster {i} GmbH" for i in range(n)]
+    sorts = [f"muster {i} gmbh" for i in range(n)]
+    urls = [f"https://firma{i}.example.at/" for i in range(n)]
+    branche, logo = "Handel", "https://www.initiativeoesterreich2040.at/logo.png"
+
+    def as_dicts():
+        return [{"name": a, "branche": branche, "url": u, "logo": logo, "sort": b}
+                for a, u, b in zip(names, urls, sorts)]
+
+    def as_entries():
+        return [sb.Entry(a, branche, u, logo, b) for a, u, b in zip(names, urls, sorts)]
+
+    for label, fn in (("dict", as_dicts), ("Entry", as_entries)):
+        mib = peak_mib(fn)
+        print(f"  {label:<40} {mib:10.1f} MiB  {mib * 2**20 / n:6.1f} bytes/entry")
+
+
+def bench_neardup():
+    """Dubletten-Erkennung bei 100k–400k Einträgen mit 2 % Schreibvarianten."""
+    print("neardup: scaling of merge_near_duplicates")
+    rng = random.Random(11)
+    words = ["Bau", "Holz", "Technik", "Wien", "Tirol", "Service", "Consulting", "Handel", "Energie", "Digital"]
+    for n in (100_000, 200_000, 400_000):
+        entries = []
+        for i in range(n):
+            name = f"{rng.choice(words)} {rng.choice(words)} {i} GmbH"
+            url = f"https://firma{i}.example.at/"
+            entries.append(sb.Entry(name, None, url, None, sb.normalize_sort_key(name)))
+            if i % 50 == 0:
+                variant = name.replace("GmbH", "G.m.b.H.")
+                entries.append(sb.Entry(variant, "Handel", f"https://www.firma{i}.example.at/kontakt", None,
+                                        sb.normalize_sort_key(variant)))
+        sb.near_dup_merges.clear()
+        sec = timeit(lambda: sb.merge_near_duplicates(entries, merge=True), repeat=1)
+        merged = len(entries) - len(sb.merge_near_duplicates(entries, merge=True))
+        print(f"  {n} entries{'':<28} {sec * 1000:10.1f} ms  "
+              f"{sec / len(entries) * 1e6:5.1f} µs/entry  {merged} merged")
+
+
+def bench_store():
+    """Kleines Update (±20 Einträge) auf 100k–1M: Voll-Sortierung vs. SortedStore.apply."""
+    print("store: full re-sort vs. bisect updates")
+    rng = random.Random(5)
+    for n in (100_000, 1_000_000):
+        entries = []
+        for i in range(n):
+            name = f"Firma {rng.randrange(10**9)} {i}"
+            entries.append(sb.Entry(name, None, f"https://f{i}.example.at/", None, sb.normalize_sort_key(name)))
+        store = sb.SortedStore()
+        store.apply(entries)
+        fresh = entries[20:] + [sb.Entry(f"Neu {i}", None, None, None, f"neu {i}") for i in range(20)]
+        report(f"{n} entries, sorted()", timeit(lambda: sorted(fresh, key=sb.entry_order), repeat=1))
+        report(f"{n} entries, SortedStore.apply", timeit(lambda: store.apply(fresh), repeat=1))
+
+
+def delay_server(delay_fn, body: bytes) -> str:
+    """Lokaler Server, der vor jeder Antwort delay_fn() Sekunden wartet."""
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(delay_fn())
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def percentile(samples, p):
+    s = sorted(samples)
+    return s[max(0, -(-len(s) * p // 100) - 1)]
+
+
+def bench_hedge():
+    """Quelle mit 2 % Ausreißern (400 ms) vs. gehedgt gegen einen 30-ms-Spiegel."""
+    print("hedge: p50 / p99 over 300 fetches")
+    sb.HTTP_CACHE_TTL = 0
+    rng = random.Random(7)
+    body = synthetic_page(50).encode("utf-8")
+    primary = delay_server(lambda: 0.4 if rng.random() < 0.02 else 0.01, body)
+    mirror = delay_server(lambda: 0.03, body)
+
+    for label, fetch in (
+        ("primary only", lambda: sb.fetch_html(primary)),
+        ("hedged", lambda: sb.fetch_hedged(primary, mirrors=[mirror])),
+    ):
+        samples = []
+        for _ in range(300):
+            t0 = time.perf_counter()
+            fetch()
+            samples.append(time.perf_counter() - t0)
+        print(f"  {label:<14} p50 {percentile(samples, 50) * 1000:7.1f} ms"
+              f"   p99 {percentile(samples, 99) * 1000:7.1f} ms"
+              f"   hedge after {sb.hedge_delay(primary) * 1000:.1f} ms")
+
+
+BENCHMARKS = {
+    "decode": bench_decode,
+    "segment": bench_segment,
+    "parser": bench_parser,
+    "workers": bench_workers,
+    "stream": bench_stream,
+    "parsecache": bench_parsecache,
+    "branche": bench_branche,
+    "normalize": bench_normalize,
+    "entry_memory": bench_entry_memory,
+    "neardup": bench_neardup,
+    "store": bench_store,
+    "hedge": bench_hedge,
+    "render": bench_render,
+    "render_memory": bench_render_memory,
+    "adversarial": bench_adversarial,
+}
+
+
+def main(argv):
+    sb.PARSE_CACHE_ENABLED = False   # sonst misst jeder Benchmark nur den Cache
+    names = argv or list(BENCHMARKS)
+    for name in names:
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
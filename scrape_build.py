@@ -1,35 +1,313 @@
+import argparse
+import asyncio
+import bisect
+import codecs
+import hashlib
+import http.server
+import json
+import math
+import os
+import queue
 import re
+import threading
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from email.message import Message
+from functools import lru_cache
+from operator import attrgetter
+
+import bs4
+import lxml.etree
+import lxml.html
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+from bs4.dammit import EncodingDetector
+from requests.adapters import HTTPAdapter
+from urllib.parse import urldefrag, urljoin, urlsplit
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
 
 SOURCE_URL = "https://www.initiativeoesterreich2040.at/unsere-unterstuetzer-build"
 BASE = "https://www.initiativeoesterreich2040.at"
 
+# Alle Quellseiten; Einträge werden zusammengeführt
+SOURCE_URLS = [SOURCE_URL]
+
+# Extraktions-Backend: "bs4" (BeautifulSoup über lxml) oder "lxml" (lxml.html direkt)
+PARSER = "bs4"
+PARSERS = ("bs4", "lxml")
+
+# Extraktion in mehreren Prozessen (1 = seriell); eine einzelne große Seite
+# wird dafür in Worker * PARALLEL_CHUNKS_PER_WORKER h3-Bereiche geschnitten
+EXTRACT_WORKERS = int(os.environ.get("SCRAPER_WORKERS", "1"))
+PARALLEL_CHUNKS_PER_WORKER = 4
+
+# Extraktions-Profil (Phasenzeiten, Knotenzahlen) in den Bericht schreiben;
+# extrahiert dann ohne Caches und seriell
+EXTRACT_STATS = os.environ.get("SCRAPER_EXTRACT_STATS", "0") == "1"
+EXTRACT_STATS_TOP = 10
+
+# Schutz vor pathologischen Seiten: pro h3-Block werden höchstens
+# BLOCK_MAX_NODES Knoten nach dem h3 gelesen und BLOCK_MAX_TEXTS Texte
+# gesammelt; Parsen + Segmentieren einer Seite darf EXTRACT_BUDGET Sekunden
+# dauern, sonst bricht die Extraktion mit ExtractBudgetExceeded ab.
+BLOCK_MAX_NODES = 5_000
+BLOCK_MAX_TEXTS = 200
+EXTRACT_BUDGET = float(os.environ.get("SCRAPER_EXTRACT_BUDGET", "30"))
+
+# Extrahierte Einträge pro Quellseite, Schlüssel = SHA-256 des HTML plus
+# EXTRACT_FINGERPRINT (ändert sich mit der Extraktionslogik, s.u.)
+PARSE_CACHE_DIR = ".cache/entries"
+PARSE_CACHE_ENABLED = os.environ.get("SCRAPER_PARSE_CACHE", "1") != "0"
+PARSE_CACHE_MAX_FILES = 64
+
+# Darunter: Ergebnisse pro h3-Block, Schlüssel = Hash des rohen Markups
+# (vorheriger Block + eigener Block, weil das Logo oberhalb des h3 steht)
+BLOCK_CACHE_FILE = ".cache/blocks.json"
+BLOCK_CACHE_MAX = 200_000
+
+# Sortierte Gesamtliste aus dem letzten Lauf; Änderungen werden per bisect eingepflegt
+STORE_FILE = ".cache/store.json"
+
+# Nahe Dubletten ("Muster GmbH" / "Muster G.m.b.H.", gleiche Domain) erkennen.
+# Standardmäßig nur berichten (near_dup_merges, Run-Report): Zusammenführen
+# entfernt veröffentlichte Unterstützer und muss bewusst eingeschaltet werden.
+NEAR_DUP_ENABLED = True
+NEAR_DUP_MERGE = os.environ.get("SCRAPER_NEAR_DUP_MERGE", "0") == "1"
+# Plattformen, auf denen viele Unterstützer eine Seite haben: dort zählt die
+# ganze URL als "Domain", nicht nur der Host
+SHARED_HOSTS = {
+    "facebook.com", "m.facebook.com", "instagram.com", "linkedin.com", "at.linkedin.com",
+    "xing.com", "twitter.com", "x.com", "youtube.com", "tiktok.com", "sites.google.com",
+    "goo.gl", "maps.google.com", "linktr.ee", "herold.at", "firmen.wko.at",
+}
+NEAR_DUP_THRESHOLD = 0.85   # Jaccard über Namens-Trigramme, bei gleicher Domain
+NEAR_DUP_PREFIX = 4         # Blocking-Schlüssel: Anfang des kompakten Namens
+NEAR_DUP_EXACT_MAX = 16     # kleinere Blöcke paarweise, größere per MinHash-LSH
+NEAR_DUP_BANDS = 8
+NEAR_DUP_ROWS = 2
+
+# Crawl-Modus (--crawl): Pagination-/Kategorie-Links unter BASE folgen
+CRAWL_PATTERN = r"unterstuetzer|[?&](?:page|seite)=\d+"
+CRAWL_MAX_PAGES = 50
+CRAWL_RATE = 4.0            # Requests pro Sekunde, 0 = unbegrenzt
+
 OUT_DIR = "dist"
 OUT_FILE = "dist/index.html"
+HTML_WRITE_BUFFER = 1 << 16     # Bytes; write_html schreibt die Karten in solchen Blöcken
+
+# Zustand zwischen den Cron-Läufen (wird im Workflow per actions/cache gesichert)
+CACHE_DIR = ".cache"
+STATE_FILE = ".cache/state.json"
+REPORT_FILE = ".cache/run_report.json"
+OFFLINE_CACHE_DIR = ".cache/offline"    # --record/--replay: eigener Zustand + Seite, echte bleiben unberührt
+
+# Fingerprint dieses Skripts (Extraktion + Vorlage): ändert er sich, wird
+# trotz unveränderter Quelle bzw. 304 neu gebaut
+with open(__file__, "rb") as _f:
+    _SOURCE = _f.read()
+del _f
+BUILD_FINGERPRINT = hashlib.sha256(_SOURCE).hexdigest()[:16]
+
+# Salz für Parse- und Block-Cache: Quelltext der Abschnitte, die Einträge
+# erzeugen (Helpers, Extraction), Scan-Konstanten und Parser-Versionen.
+# Jede Änderung dort verwirft die Caches, Vorlage und CSS nicht. Fehlt ein
+# Abschnitt (umbenannt), scheitert schon der Import.
+_SECTIONS = re.split(rb"\n# -+\n# (.+)\n# -+\n", _SOURCE)
+_SECTIONS = dict(zip(_SECTIONS[1::2], _SECTIONS[2::2]))
+EXTRACT_FINGERPRINT = hashlib.sha256(
+    _SECTIONS[b"Helpers"] + _SECTIONS[b"Extraction"]
+    + repr((BASE, BLOCK_MAX_NODES, BLOCK_MAX_TEXTS, lxml.etree.LXML_VERSION, lxml.etree.LIBXML_VERSION,
+            bs4.__version__)).encode("utf-8")
+).hexdigest()[:16]
+del _SOURCE, _SECTIONS
+
+# HTTP: ein gemeinsamer Session-Pool für alle Requests
+USER_AGENT = "Mozilla/5.0 (supporter-scraper; +github-actions)"
+HTTP_TIMEOUT = 30
+HTTP_POOL_SIZE = int(os.environ.get("SCRAPER_POOL_SIZE", "10"))   # Verbindungen pro Host
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.5          # s, verdoppelt sich pro Versuch
+HTTP_BACKOFF_JITTER = 0.5   # s, zufälliger Aufschlag
+HTTP_RETRY_STATUS = (429, 500, 502, 503, 504)
+FETCH_CONCURRENCY = 8       # parallele Downloads gesamt
+FETCH_PER_HOST = 4          # parallele Downloads pro Host
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Gleichwertige Spiegel pro Quelle (z.B. gecachte Kopie, CDN). Antwortet die
+# Quelle nicht innerhalb ihres p95 (aus früheren Läufen), geht ein zweiter
+# Request an den nächsten Spiegel; die erste vollständige Antwort gewinnt.
+MIRRORS = {}                # url -> [mirror_url, ...]
+HEDGE_PERCENTILE = 95
+HEDGE_DEFAULT_DELAY = 2.0   # s, solange zu wenig Messwerte vorliegen
+HEDGE_MIN_SAMPLES = 5
+HEDGE_HISTORY = 50          # TTFB-Messwerte pro URL im State
+
+# Lokaler Antwort-Cache (Body + Header), LRU über mtime
+HTTP_CACHE_DIR = ".cache/http"
+HTTP_CACHE_TTL = int(os.environ.get("SCRAPER_CACHE_TTL", "300"))                 # s, 0 = aus
+HTTP_CACHE_MAX_BYTES = int(os.environ.get("SCRAPER_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
 
 
 # -----------------------------
 # Helpers
 # -----------------------------
 
+# Eine Faltungstabelle für Sortierung, Dubletten und die Suche im Browser:
+# build_html schreibt sie als FOLD ins Script, norm() dort faltet identisch.
+# (str.translate wäre naheliegend, ist mit mehrzeichigen Ersetzungen in
+# CPython aber ~3x langsamer als replace() je Tabelleneintrag.)
+FOLD_MAP = {"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"}
+_FOLD_ITEMS = tuple(FOLD_MAP.items())
+
+
+@lru_cache(maxsize=65536)
 def normalize_sort_key(name: str) -> str:
-    s = name.strip().lower()
-    s = (
-        s.replace("ä", "ae")
-         .replace("ö", "oe")
-         .replace("ü", "ue")
-         .replace("ß", "ss")
-    )
-    return re.sub(r"\s+", " ", s)
+    # kleinschreiben, Umlaute falten, Whitespace zusammenziehen und trimmen
+    s = name.lower()
+    if not s.isascii():
+        for src, dst in _FOLD_ITEMS:
+            s = s.replace(src, dst)
+    return " ".join(s.split())
 
 
-def fetch_html(url: str) -> str:
-    headers = {"User-Agent": "Mozilla/5.0 (supporter-scraper; +github-actions)"}
-    r = requests.get(url, headers=headers, timeout=30)
-    r.raise_for_status()
-    return r.text
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state: dict) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def set_output(name: str, value: str) -> None:
+    """Schreibt einen Step-Output für GitHub Actions (lokal ein No-op)."""
+    path = os.environ.get("GITHUB_OUTPUT")
+    if path:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(f"{name}={value}\n")
+
+
+# -----------------------------
+# Network timing
+# -----------------------------
+#
+# Jeder fetch_html-Aufruf hinterlässt einen Eintrag in _net_log. Die
+# Verbindungszeit kommt aus den Connection-Klassen unten; sie sammeln pro
+# Thread, weil fetch_many jeden Request in einem eigenen Worker-Thread macht.
+
+_net_log = []
+_net_lock = threading.Lock()
+_net_local = threading.local()
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        super().connect()
+        _net_local.connect = getattr(_net_local, "connect", 0.0) + time.perf_counter() - t0
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        t0 = time.perf_counter()
+        super().connect()   # inkl. TLS-Handshake
+        _net_local.connect = getattr(_net_local, "connect", 0.0) + time.perf_counter() - t0
+
+
+class _TimedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPPool, "https": _TimedHTTPSPool}
+
+
+_latency = {}               # url -> letzte TTFB-Werte in ms (persistiert im State)
+
+
+def log_request(**fields) -> None:
+    with _net_lock:
+        _net_log.append(fields)
+        # Fehlschläge messen keine Antwortzeit, sie würden den Hedge verzerren
+        if fields["status"] not in ("cache", "error"):
+            samples = _latency.setdefault(fields["url"], [])
+            samples.append(fields["ttfb_ms"])
+            del samples[:-HEDGE_HISTORY]
+
+
+def net_summary() -> None:
+    """Tabelle aller Requests dieses Laufs auf stdout."""
+    if not _net_log:
+        return
+    print(f"{'status':>6} {'connect':>8} {'ttfb':>8} {'download':>9} {'wire':>10} {'body':>10}  url")
+    for r in _net_log:
+        print(
+            f"{r['status']:>6} {r['connect_ms']:>6.1f}ms {r['ttfb_ms']:>6.1f}ms {r['download_ms']:>7.1f}ms"
+            f" {r['wire_bytes']:>10} {r['body_bytes']:>10}  {r['url']}"
+            + (f"  ({r['error']})" if "error" in r else "")
+        )
+
+
+def write_report(path: str, **fields) -> None:
+    """Maschinenlesbarer Bericht über den Lauf (Requests + weitere Felder)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    report = dict(fields, requests=list(_net_log))
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+_session = None
+
+
+def get_session() -> requests.Session:
+    """Gemeinsame Session mit Keep-Alive, Connection-Pool und Retry/Backoff."""
+    global _session
+    if _session is None:
+        retry = Retry(
+            total=HTTP_RETRIES,
+            backoff_factor=HTTP_BACKOFF,
+            backoff_jitter=HTTP_BACKOFF_JITTER,
+            status_forcelist=HTTP_RETRY_STATUS,
+            allowed_methods=("GET", "HEAD"),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = _TimedAdapter(
+            pool_connections=HTTP_POOL_SIZE,
+            pool_maxsize=HTTP_POOL_SIZE,
+            max_retries=retry,
+        )
+        s = requests.Session()
+        s.headers["User-Agent"] = USER_AGENT
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        _session = s
+    return _session
+
+
+def declared_charset(content_type: str | None) -> str | None:
+    """Charset aus dem Content-Type-Header, None wenn keiner angegeben ist."""
+    if not content_type:
+        return None
+    m = Message()
+    m["Content-Type"] = content_type
+    return m.get_content_charset()
 
 
 def esc_attr(s: str) -> str:
@@ -44,127 +322,1641 @@ def esc_attr(s: str) -> str:
 
 
 # -----------------------------
-# Extraction
+# HTTP cache
 # -----------------------------
 
-def extract_entries(html: str):
-    soup = BeautifulSoup(html, "lxml")
-    headings = soup.find_all("h3")
-    entries = []
+def _cache_paths(url: str):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    base = os.path.join(HTTP_CACHE_DIR, key)
+    return base + ".body", base + ".json"
 
-    SKIP_TITLES = {
-        "KONTAKTIEREN SIE UNS WENN SIE UNTERSTÜTZER WERDEN WOLLEN",
-        "ÜBER INITIATIVE ÖSTERREICH 2040",
-    }
 
-    def find_logo_before_h3(h3):
-        """
-        Logo steht IMMER oberhalb des h3.
-        Wir suchen rückwärts, stoppen aber beim vorherigen h3.
-        """
-        for el in h3.previous_elements:
-            if getattr(el, "name", None) == "h3":
-                break
-            if getattr(el, "name", None) == "img":
-                src = el.get("src")
-                if src:
-                    return urljoin(BASE, src)
+def _write_atomic(path: str, data: bytes) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def cache_get(url: str):
+    """(body, meta) wenn ein frischer Eintrag existiert, sonst None."""
+    if HTTP_CACHE_TTL <= 0:
         return None
+    body_path, meta_path = _cache_paths(url)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        if time.time() - meta["fetched_at"] > HTTP_CACHE_TTL:
+            return None
+        with open(body_path, "rb") as f:
+            body = f.read()
+        os.utime(body_path)   # als zuletzt benutzt markieren
+    except (OSError, ValueError, KeyError):
+        return None
+    return body, meta
+
+
+def cache_put(url: str, body: bytes, headers) -> None:
+    if HTTP_CACHE_TTL <= 0:
+        return
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    body_path, meta_path = _cache_paths(url)
+    meta = {
+        "url": url,
+        "fetched_at": time.time(),
+        "headers": {k: headers[k] for k in ("Content-Type", "ETag", "Last-Modified") if headers.get(k)},
+    }
+    _write_atomic(body_path, body)
+    _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    cache_evict()
+
+
+def cache_refresh(url: str) -> None:
+    """Nach einem 304: vorhandenen Eintrag wieder als frisch markieren."""
+    body_path, meta_path = _cache_paths(url)
+    try:
+        with open(meta_path, encoding="utf-8") as f:
+            meta = json.load(f)
+        meta["fetched_at"] = time.time()
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        os.utime(body_path)
+    except (OSError, ValueError):
+        pass
+
+
+def cache_evict(max_bytes: int | None = None) -> None:
+    """Älteste (least recently used) Einträge löschen, bis das Budget passt."""
+    max_bytes = HTTP_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    try:
+        names = [n for n in os.listdir(HTTP_CACHE_DIR) if n.endswith(".body")]
+    except OSError:
+        return
+
+    items = []
+    total = 0
+    for n in names:
+        try:
+            st = os.stat(os.path.join(HTTP_CACHE_DIR, n))
+        except OSError:
+            continue
+        items.append((st.st_mtime, st.st_size, n))
+        total += st.st_size
+
+    for _, size, n in sorted(items):
+        if total <= max_bytes:
+            break
+        base = os.path.join(HTTP_CACHE_DIR, n[:-len(".body")])
+        for path in (base + ".body", base + ".json"):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        total -= size
+
+
+# -----------------------------
+# Record / Replay
+# -----------------------------
+#
+# --record DIR schreibt jede Antwort von fetch_html in ein Fixture-Bundle,
+# --replay DIR spielt es über einen lokalen HTTP-Server wieder ab (optional
+# mit künstlicher Latenz und Bandbreite) – für Messungen ohne Netz.
+
+BUNDLE_INDEX = "bundle.json"
+
+_recording = None           # url -> Metadaten, solange aufgezeichnet wird
+_record_lock = threading.Lock()
+_replay_base = None         # z.B. "http://127.0.0.1:54321" im Replay-Modus
+
+
+def start_recording() -> None:
+    global _recording
+    _recording = {}
+
+
+def record_response(url: str, status: int, body: bytes, headers) -> None:
+    if _recording is None:
+        return
+    with _record_lock:
+        _recording[url] = {
+            "status": status,
+            "headers": {k: headers[k] for k in ("Content-Type", "ETag", "Last-Modified") if headers.get(k)},
+            "body": body,
+        }
+
+
+def save_recording(bundle_dir: str) -> None:
+    os.makedirs(bundle_dir, exist_ok=True)
+    index = {}
+    for url, rec in (_recording or {}).items():
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16] + ".body"
+        _write_atomic(os.path.join(bundle_dir, name), rec["body"])
+        index[url] = {"file": name, "status": rec["status"], "headers": rec["headers"]}
+    with open(os.path.join(bundle_dir, BUNDLE_INDEX), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    print(f"Recorded {len(index)} responses to {bundle_dir}")
+
+
+def _replay_key(url: str) -> str:
+    return "/" + hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+
+
+def start_replay_server(bundle_dir: str, latency: float = 0.0, bandwidth: int | None = None) -> str:
+    """
+    Startet einen lokalen Server für das Bundle in einem Daemon-Thread und
+    leitet fetch_html dorthin um. `latency` in Sekunden vor jeder Antwort,
+    `bandwidth` in Bytes/s (None = unbegrenzt). Liefert die Basis-URL.
+    """
+    global _replay_base
+    with open(os.path.join(bundle_dir, BUNDLE_INDEX), encoding="utf-8") as f:
+        index = json.load(f)
+    routes = {_replay_key(url): rec for url, rec in index.items()}
+    chunk = 16 * 1024
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True   # sonst verzögert Keep-Alive jede Antwort um ~40 ms
+
+        def do_GET(self):
+            rec = routes.get(self.path)
+            if latency:
+                time.sleep(latency)
+            if rec is None:
+                self.send_error(404)
+                return
+
+            etag = rec["headers"].get("ETag")
+            if etag and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            with open(os.path.join(bundle_dir, rec["file"]), "rb") as f:
+                body = f.read()
+            self.send_response(rec["status"])
+            for k, v in rec["headers"].items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            for i in range(0, len(body), chunk):
+                part = body[i:i + chunk]
+                self.wfile.write(part)
+                if bandwidth:
+                    time.sleep(len(part) / bandwidth)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _replay_base = f"http://127.0.0.1:{server.server_address[1]}"
+    return _replay_base
+
+
+# -----------------------------
+# Fetching
+# -----------------------------
 
-    for h in headings:
-        name = h.get_text(" ", strip=True).replace("\xa0", " ").strip()
-        if not name:
+def fetch_html(url: str, validators: dict | None = None, sink=None):
+    """
+    Holt die Seite als Bytes und liefert (body, charset) – charset nur, wenn
+    der Server ihn deklariert; sonst erkennt der Parser ihn aus <meta>.
+    Bewusst kein r.text: das würde ohne charset die ganze Seite durch die
+    Zeichensatz-Erkennung von requests schicken.
+
+    Mit `validators` (etag / last_modified aus dem letzten Lauf) wird ein
+    Conditional GET geschickt; bei 304 kommt None zurück. Die Validatoren der
+    neuen Antwort werden in `validators` übernommen.
+
+    Antworten landen im Cache unter HTTP_CACHE_DIR; innerhalb von
+    HTTP_CACHE_TTL wird gar nicht erst angefragt.
+
+    Mit `sink` (z.B. StreamExtractor) wird der Body nicht gesammelt, sondern
+    stückweise per sink.begin(charset) / sink.feed(chunk) weitergereicht,
+    während er noch lädt. Das Ergebnis ist dann (None, charset); Cache und
+    Aufnahme werden nur gelesen, nicht befüllt.
+    """
+    cached = cache_get(url)
+    if cached is not None:
+        body, meta = cached
+        cached_headers = meta.get("headers", {})
+        if validators is not None:
+            validators.clear()
+            if cached_headers.get("ETag"):
+                validators["etag"] = cached_headers["ETag"]
+            if cached_headers.get("Last-Modified"):
+                validators["last_modified"] = cached_headers["Last-Modified"]
+        log_request(url=url, status="cache", connect_ms=0.0, ttfb_ms=0.0, download_ms=0.0,
+                    wire_bytes=0, body_bytes=len(body))
+        charset = declared_charset(cached_headers.get("Content-Type"))
+        if sink is not None:
+            sink.begin(charset)
+            sink.feed(body)
+            return None, charset
+        return body, charset
+
+    headers = {}
+    if validators is not None:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+    target = _replay_base + _replay_key(url) if _replay_base else url
+    _net_local.connect = 0.0
+    t0 = time.perf_counter()
+    t_headers = None
+    body_bytes = 0
+    try:
+        r = get_session().get(target, headers=headers, timeout=HTTP_TIMEOUT, stream=True)
+        t_headers = time.perf_counter()
+        charset = declared_charset(r.headers.get("Content-Type"))
+        if sink is not None and r.status_code == 200:
+            sink.begin(charset)
+            body = None
+            for chunk in r.iter_content(STREAM_CHUNK_SIZE):
+                sink.feed(chunk)
+                body_bytes += len(chunk)
+        else:
+            body = r.content
+            body_bytes = len(body)
+    except Exception as exc:
+        # Timeouts und Verbindungsfehler gehören gerade in den Bericht: ohne
+        # Header steht die Zeit bis zum Fehler in ttfb_ms, sonst in download_ms
+        t_fail = time.perf_counter()
+        log_request(
+            url=url,
+            status="error",
+            error=type(exc).__name__,
+            connect_ms=round(_net_local.connect * 1000, 2),
+            ttfb_ms=round(((t_headers or t_fail) - t0) * 1000, 2),
+            download_ms=round((t_fail - t_headers) * 1000, 2) if t_headers else 0.0,
+            wire_bytes=r.raw.tell() if t_headers else 0,
+            body_bytes=body_bytes,
+        )
+        raise
+    t_done = time.perf_counter()
+    log_request(
+        url=url,
+        status=r.status_code,
+        connect_ms=round(_net_local.connect * 1000, 2),
+        ttfb_ms=round((t_headers - t0) * 1000, 2),
+        download_ms=round((t_done - t_headers) * 1000, 2),
+        wire_bytes=r.raw.tell(),   # vor Dekompression
+        body_bytes=body_bytes,
+    )
+
+    if r.status_code == 304:
+        cache_refresh(url)
+        return None
+    r.raise_for_status()
+    if body is not None:
+        cache_put(url, body, r.headers)
+        record_response(url, r.status_code, body, r.headers)
+
+    if validators is not None:
+        validators.clear()
+        if r.headers.get("ETag"):
+            validators["etag"] = r.headers["ETag"]
+        if r.headers.get("Last-Modified"):
+            validators["last_modified"] = r.headers["Last-Modified"]
+    return body, charset
+
+
+def hedge_delay(url: str) -> float:
+    """Wartezeit bis zum Hedge: HEDGE_PERCENTILE der bisherigen TTFB von `url`."""
+    with _net_lock:
+        samples = sorted(_latency.get(url, []))
+    if len(samples) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY
+    idx = math.ceil(HEDGE_PERCENTILE / 100 * len(samples)) - 1
+    return samples[idx] / 1000
+
+
+def fetch_hedged(url: str, validators: dict | None = None, mirrors=None, delay: float | None = None):
+    """
+    Wie fetch_html, aber mit Hedging über MIRRORS[url]: nach `delay` Sekunden
+    (Standard: hedge_delay) ohne Antwort startet der nächste Spiegel, ein
+    Fehler startet ihn sofort. Das erste erfolgreiche Ergebnis gewinnt, die
+    übrigen Requests laufen in Daemon-Threads aus (blockieren das Ende nicht).
+    """
+    mirrors = list(MIRRORS.get(url, ()) if mirrors is None else mirrors)
+    if not mirrors:
+        return fetch_html(url, validators)
+    delay = hedge_delay(url) if delay is None else delay
+
+    # Eigene Kopie: ein verlierender Request darf die Validatoren nicht mehr ändern
+    own = dict(validators) if validators is not None else None
+    # Daemon-Threads statt Executor: ein hängender Verlierer soll weder den
+    # Aufrufer noch das Prozessende aufhalten
+    results = queue.Queue()
+
+    def start(src, vals):
+        def run():
+            try:
+                results.put((src, fetch_html(src, vals), None))
+            except Exception as e:
+                results.put((src, None, e))
+        threading.Thread(target=run, name=f"hedge {src}", daemon=True).start()
+
+    start(url, own)
+    running = 1
+    errors = []
+    while running:
+        try:
+            src, result, error = results.get(timeout=delay if mirrors else None)
+        except queue.Empty:
+            mirror = mirrors.pop(0)
+            print(f"Hedging {url} -> {mirror} after {delay * 1000:.0f} ms")
+            start(mirror, None)
+            running += 1
             continue
-        if name.upper() in SKIP_TITLES:
+        running -= 1
+        if error is not None:
+            errors.append(error)
+            if mirrors:
+                start(mirrors.pop(0), None)
+                running += 1
             continue
+        if validators is not None:
+            # Spiegel haben eigene ETags – dann nächstes Mal unbedingt laden
+            validators.clear()
+            if src == url:
+                validators.update(own)
+        return result
+    raise errors[0]
+
+
+async def _fetch_many(urls, validators_by_url, rate: float = 0.0, return_exceptions: bool = False):
+    total = asyncio.Semaphore(FETCH_CONCURRENCY)
+    per_host = {}
+    pace = asyncio.Lock()
+    next_start = 0.0
+
+    async def wait_turn():
+        # Startzeitpunkte im Abstand 1/rate vergeben
+        nonlocal next_start
+        async with pace:
+            now = time.monotonic()
+            delay = next_start - now
+            next_start = max(now, next_start) + 1 / rate
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    # Eigener Pool: der Standard-Executor hat nur min(32, CPUs + 4) Threads
+    loop = asyncio.get_running_loop()
+    pool = ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY, thread_name_prefix="fetch")
+
+    async def one(url):
+        host = urlsplit(url).netloc
+        host_sem = per_host.setdefault(host, asyncio.Semaphore(FETCH_PER_HOST))
+        async with total, host_sem:
+            if rate > 0:
+                await wait_turn()
+            # requests blockiert – im Thread laufen lassen, Session-Pool teilen
+            return await loop.run_in_executor(pool, fetch_hedged, url, validators_by_url.get(url))
+
+    try:
+        return await asyncio.gather(*(one(u) for u in urls), return_exceptions=return_exceptions)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def fetch_many(urls, validators_by_url=None, rate: float = 0.0, return_exceptions: bool = False):
+    """
+    Lädt alle `urls` parallel (FETCH_CONCURRENCY gesamt, FETCH_PER_HOST pro
+    Host, optional höchstens `rate` Starts pro Sekunde). Ergebnisse in
+    derselben Reihenfolge wie fetch_html, also (body, charset) oder None bei 304;
+    mit `return_exceptions` stehen Fehler als Exception-Objekte in der Liste.
+    """
+    return asyncio.run(_fetch_many(list(urls), validators_by_url or {}, rate, return_exceptions))
+
+
+def discover_links(body: bytes, page_url: str, pattern) -> list:
+    """Absolute Links unter BASE, die auf `pattern` passen (ohne Fragment)."""
+    try:
+        doc = lxml.html.document_fromstring(body)
+    except (ValueError, lxml.etree.ParserError):
+        return []
+    base = urlsplit(BASE)
+    found = []
+    for href in doc.xpath("//a/@href"):
+        url = urldefrag(urljoin(page_url, href.strip()))[0]
+        parts = urlsplit(url)
+        # Host exakt vergleichen: startswith(BASE) ließe "….at.evil.example" durch
+        if (parts.scheme, parts.netloc.lower()) == (base.scheme, base.netloc) and pattern.search(url):
+            found.append(url)
+    return found
+
+
+def crawl(start_urls, pattern: str = CRAWL_PATTERN, max_pages: int = CRAWL_MAX_PAGES, rate: float = CRAWL_RATE):
+    """
+    Breitensuche ab `start_urls`: jede Ebene wird parallel geladen, neue
+    Links landen dedupliziert in der Frontier. Liefert [(url, (body, charset))].
+    Fehler bei gefundenen Links werden gemeldet und übersprungen.
+    """
+    rx = re.compile(pattern)
+    starts = set(start_urls)
+    seen = set(start_urls)
+    frontier = list(start_urls)
+    pages = []
+
+    while frontier and len(pages) < max_pages:
+        level = frontier[:max_pages - len(pages)]
+        frontier = []
+        for url, result in zip(level, fetch_many(level, rate=rate, return_exceptions=True)):
+            if isinstance(result, Exception):
+                # Startseiten müssen gehen, gefundene Links dürfen ins Leere zeigen
+                if url in starts:
+                    raise result
+                print(f"Skipping {url}: {result}")
+                continue
+            pages.append((url, result))
+            for link in discover_links(result[0], url, rx):
+                if link not in seen:
+                    seen.add(link)
+                    frontier.append(link)
+
+    print(f"Crawled {len(pages)} pages ({len(frontier)} left in frontier)")
+    return pages
+
+
+# -----------------------------
+# Extraction
+# -----------------------------
 
-        logo_url = find_logo_before_h3(h)
+@dataclass(slots=True)
+class Entry:
+    """Ein Unterstützer – gemeinsamer Datensatz für Extraktion, Dedup, Sortierung und Ausgabe."""
+    name: str
+    branche: str | None
+    url: str | None
+    logo: str | None
+    sort: str
 
-        texts = []
-        link = None
+    def row(self) -> list:
+        """Kompakte Form für die Caches; Entry(*row) stellt den Eintrag wieder her."""
+        return [self.name, self.branche, self.url, self.logo, self.sort]
 
-        # Vorwärts lesen bis zum nächsten h3
-        for el in h.next_elements:
-            if getattr(el, "name", None) == "h3":
+
+SKIP_TITLES = {
+    "KONTAKTIEREN SIE UNS WENN SIE UNTERSTÜTZER WERDEN WOLLEN",
+    "ÜBER INITIATIVE ÖSTERREICH 2040",
+}
+
+
+_BRANCHE_LABEL = re.compile(r"\bBranche\s*:", re.IGNORECASE)
+_BRANCHE_LABEL_END = re.compile(r"\bBranche\s*$", re.IGNORECASE)
+_URL_BREAK = re.compile(r"\shttps?://", re.IGNORECASE)
+_URL_START = re.compile(r"https?://", re.IGNORECASE)
+
+
+def find_branche(texts):
+    r"""
+    Branche aus den Textknoten eines Blocks: ab dem Knoten mit dem Label
+    "Branche:" bis zur ersten folgenden URL bzw. zum Blockende.
+
+    Entspricht der Regex \bBranche\s*:\s*(.+?)(?=\shttps?://|$) über den
+    zusammengefügten Blocktext, baut diesen aber nicht: gesucht wird nur
+    der Label-Knoten, danach werden Knoten bis zur URL angehängt.
+    """
+    for i, t in enumerate(texts):
+        m = _BRANCHE_LABEL.search(t)
+        if m:
+            rest, nxt = t[m.end():], i + 1
+        elif i + 1 < len(texts) and texts[i + 1].startswith(":") and _BRANCHE_LABEL_END.search(t):
+            # "Branche" und ":" in getrennten Knoten (z.B. <strong>Branche</strong>:)
+            rest, nxt = texts[i + 1][1:], i + 2
+        else:
+            continue
+
+        value = ""
+        for piece in (rest, *texts[nxt:]):
+            piece = " ".join(piece.split())
+            if not piece:
+                continue
+            if value and _URL_START.match(piece):
+                break
+            cut = _URL_BREAK.search(piece)
+            if cut:
+                piece = piece[:cut.start()]
+            value = f"{value} {piece}" if value else piece
+            if cut:
                 break
+        # Label ganz am Ende: die Regex findet dahinter nichts mehr
+        return value.strip() or None
+    return None
 
-            if link is None and getattr(el, "name", None) == "a":
-                href = el.get("href", "").strip()
-                if href.startswith("http://") or href.startswith("https://"):
-                    link = href
 
-            if isinstance(el, str):
-                t = el.strip().replace("\xa0", " ")
-                if t:
-                    texts.append(t)
+def make_entry(heading: str, logo_url, link, texts):
+    """Eintrag aus einem h3-Block, None für Überschriften ohne Partner."""
+    name = heading.replace("\xa0", " ").strip()
+    if not name:
+        return None
+    if name.upper() in SKIP_TITLES:
+        return None
+
+    branche = find_branche(texts)
 
-        block_text = re.sub(r"\s+", " ", " ".join(texts)).strip()
+    # Nur echte Partner übernehmen
+    if not (logo_url or branche or link):
+        return None
 
-        branche = None
-        m = re.search(
-            r"\bBranche\s*:\s*(.+?)(?=(?:\shttps?://)|$)",
-            block_text,
-            flags=re.IGNORECASE,
+    return Entry(name, branche, link, logo_url, normalize_sort_key(name))
+
+
+class ExtractBudgetExceeded(RuntimeError):
+    """Parsen/Segmentieren einer Seite hat EXTRACT_BUDGET überschritten."""
+
+
+def check_budget(deadline: float, phase: str, nodes: int = 0) -> None:
+    if time.perf_counter() > deadline:
+        raise ExtractBudgetExceeded(
+            f"extraction exceeded its {EXTRACT_BUDGET:g}s budget during {phase} "
+            f"({nodes} nodes segmented); raise SCRAPER_EXTRACT_BUDGET if the page is legit"
         )
-        if m:
-            branche = m.group(1).strip() or None
 
-        # Nur echte Partner übernehmen
-        if not (logo_url or branche or link):
+
+def segment_blocks(soup, positions: list | None = None, deadline: float | None = None):
+    """
+    Zerlegt das Dokument in einem einzigen Durchlauf in h3-Blöcke.
+
+    Liefert pro h3 (h3, logo, link, texts):
+    - logo: letztes <img src> zwischen vorherigem h3 und diesem
+      (Logo steht IMMER oberhalb des h3)
+    - link: erster http(s)-Link nach dem h3 bis zum nächsten h3
+    - texts: alle nicht-leeren Textknoten in diesem Bereich
+
+    Mit `positions` wird dort die Knotennummer jedes h3 und am Ende die
+    Gesamtzahl der Knoten abgelegt (für extract_entries(stats=...)).
+
+    Pro Block werden höchstens BLOCK_MAX_NODES Knoten nach dem h3 und
+    BLOCK_MAX_TEXTS Texte berücksichtigt; nach `deadline` (Standard: jetzt +
+    EXTRACT_BUDGET) bricht die Segmentierung mit ExtractBudgetExceeded ab.
+    """
+    blocks = []
+    current = None      # [h3, logo, link, texts] des zuletzt gesehenen h3
+    last_img = None     # letzter Logo-Kandidat seit dem letzten h3
+    block_end = 0       # Knotennummer, ab der der aktuelle Block nicht mehr gelesen wird
+    deadline = deadline or time.perf_counter() + EXTRACT_BUDGET
+
+    n = -1
+    for n, el in enumerate(soup.descendants):
+        if not n & 4095:
+            check_budget(deadline, "segmentation", n)
+        name = el.name
+        if name == "h3":
+            current = [el, urljoin(BASE, last_img) if last_img else None, None, []]
+            blocks.append(current)
+            last_img = None
+            block_end = n + BLOCK_MAX_NODES
+            if positions is not None:
+                positions.append(n)
+        elif name == "img":
+            src = el.get("src")
+            if src:
+                last_img = src
+        elif current is None:
+            continue
+        elif n > block_end:
+            current = None      # Scan-Limit: Rest bis zum nächsten h3 ignorieren
+        elif name == "a":
+            if current[2] is None:
+                href = el.get("href", "").strip()
+                if href.startswith("http://") or href.startswith("https://"):
+                    current[2] = href
+        elif name is None:
+            t = el.strip().replace("\xa0", " ")
+            if t and len(current[3]) < BLOCK_MAX_TEXTS:
+                current[3].append(t)
+
+    if positions is not None:
+        positions.append(n + 1)
+    return blocks
+
+
+@lru_cache(maxsize=64)
+def known_codec(name: str | None) -> bool:
+    """
+    Kennen Python und libxml2 den Zeichensatz? Unbekannte oder verstümmelte
+    Angaben werden wie bei BeautifulSoup übergangen (dort scheitert lxml an
+    z.B. "latin-1" ebenso und es geht mit dem nächsten Kandidaten weiter).
+    """
+    if not name:
+        return False
+    try:
+        codecs.lookup(name)
+        lxml.etree.HTMLParser(encoding=name)
+    except (LookupError, ValueError):
+        return False
+    return True
+
+
+def sniff_encoding(body: bytes, encoding: str | None = None) -> str:
+    """
+    Zeichensatz wie bei BeautifulSoup: deklariert (Header, sonst <meta>),
+    sonst UTF-8, sonst windows-1252. Unbekannte Namen zählen nicht.
+    """
+    if known_codec(encoding):
+        return encoding
+    declared = EncodingDetector.find_declared_encoding(body, is_html=True)
+    if known_codec(declared):
+        return declared
+    try:
+        body.decode("utf-8")
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "windows-1252"
+
+
+def parse_lxml(html, encoding: str | None = None):
+    """
+    lxml.html-Dokument mit derselben Zeichensatz-Wahl wie BeautifulSoup.
+    huge_tree hebt libxml2s Grenze von 256 Verschachtelungsebenen auf (sonst
+    bleibt der Baum ab dort leer). Bricht libxml2 trotzdem ab (FATAL im
+    error_log), kommt None zurück – der Baum wäre unvollständig.
+    """
+    if isinstance(html, bytes):
+        encoding = sniff_encoding(html, encoding)
+        parser = lxml.html.HTMLParser(encoding=encoding, huge_tree=True)
+    else:
+        parser = lxml.html.HTMLParser(huge_tree=True)
+    root = lxml.html.document_fromstring(html, parser=parser)
+    if any(e.level_name == "FATAL" for e in parser.error_log):
+        return None
+    return root
+
+
+def segment_blocks_lxml(root, positions: list | None = None, deadline: float | None = None):
+    """
+    Wie segment_blocks, aber direkt auf lxml-Elementen. Text steht dort in
+    .text/.tail; der Baum wird mit einem expliziten Stack in
+    Dokumentreihenfolge abgelaufen, damit auch Kommentare (wie bei bs4)
+    mitzählen. Knoten (für `positions` und BLOCK_MAX_NODES) sind hier
+    Elemente und Kommentare.
+    """
+    blocks = []
+    current = None
+    last_img = None
+    block_end = 0
+    deadline = deadline or time.perf_counter() + EXTRACT_BUDGET
+    n = 0
+
+    def add_text(t):
+        if current is not None and t:
+            t = t.strip().replace("\xa0", " ")
+            if t and len(current[3]) < BLOCK_MAX_TEXTS:
+                current[3].append(t)
+
+    stack = [(root, iter(root))]
+    add_text(root.text)
+    while stack:
+        parent, children = stack[-1]
+        el = next(children, None)
+        if el is None:
+            stack.pop()
+            add_text(parent.tail)
             continue
 
-        entries.append({
-            "name": name,
-            "branche": branche,
-            "url": link,
-            "logo": logo_url,
-            "sort": normalize_sort_key(name),
-        })
+        n += 1
+        if not n & 4095:
+            check_budget(deadline, "segmentation", n)
+        if current is not None and n > block_end:
+            current = None      # Scan-Limit: Rest bis zum nächsten h3 ignorieren
+        tag = el.tag
+        if not isinstance(tag, str):
+            # Kommentar / Processing Instruction
+            if isinstance(el, lxml.etree._Comment):
+                add_text(el.text)
+            add_text(el.tail)
+            continue
 
-    # Dedup
+        if tag == "h3":
+            current = [el, urljoin(BASE, last_img) if last_img else None, None, []]
+            blocks.append(current)
+            last_img = None
+            block_end = n + BLOCK_MAX_NODES
+            if positions is not None:
+                positions.append(n - 1)
+        elif tag == "img":
+            src = el.get("src")
+            if src:
+                last_img = src
+        elif tag == "a" and current is not None and current[2] is None:
+            href = el.get("href", "").strip()
+            if href.startswith("http://") or href.startswith("https://"):
+                current[2] = href
+
+        add_text(el.text)
+        stack.append((el, iter(el)))
+
+    if positions is not None:
+        positions.append(n)
+    return blocks
+
+
+class _BlockTarget:
+    """
+    lxml-Parser-Target: baut keinen Baum, sondern nur den aktuellen h3-Block
+    und gibt ihn an `emit` weiter, sobald das nächste h3 (oder das Dokument-
+    ende) ihn abschließt. Textknoten werden bis zum nächsten Tag gepuffert,
+    damit sie wie bei bs4 als Ganzes zählen, egal wie die Chunks fallen.
+
+    Die Überschrift ist wie bei get_text() der ganze Text des h3-Elements:
+    steckt in einem nicht geschlossenen h3 ein weiteres, gehört dessen Text
+    zu beiden. Ein Block wird deshalb erst ausgegeben, wenn auch sein h3
+    geschlossen ist, und immer in Dokumentreihenfolge.
+    """
+
+    def __init__(self, emit):
+        self.emit = emit
+        self.block = None       # [heading, logo, link, texts, h3_closed]
+        self.last_img = None
+        self.open_h3 = []       # Blöcke, deren h3 noch offen ist (innerstes zuletzt)
+        self.h3_texts = []      # Texte in offenen h3; heading = Startindex, bis das h3 schließt
+        self.pending = deque()  # Blöcke in Dokumentreihenfolge, noch nicht ausgegeben
+        self.buf = []
+        self.nodes = 0          # Tags + Kommentare, für BLOCK_MAX_NODES
+        self.block_end = 0
+
+    def _open(self):
+        """Block wird noch gelesen (Scan-Limit nicht erreicht)."""
+        return self.block is not None and self.nodes <= self.block_end
+
+    def _flush(self):
+        if not self.buf:
+            return
+        raw = "".join(self.buf)
+        self.buf.clear()
+        if self.block is None:
+            return
+        t = raw.strip().replace("\xa0", " ")
+        if t:
+            if len(self.block[3]) < BLOCK_MAX_TEXTS and self.nodes <= self.block_end:
+                self.block[3].append(t)
+            if self.open_h3:
+                self.h3_texts.append(raw.strip())
+
+    def _emit_ready(self):
+        pending = self.pending
+        while pending and pending[0] is not self.block and pending[0][4]:
+            self.emit(*pending.popleft()[:4])
+
+    def _close_block(self):
+        self.block = None
+        self._emit_ready()
+
+    def start(self, tag, attrib):
+        self._flush()
+        self.nodes += 1
+        if tag == "h3":
+            self._close_block()
+            self.block = [len(self.h3_texts), urljoin(BASE, self.last_img) if self.last_img else None, None, [], False]
+            self.pending.append(self.block)
+            self.open_h3.append(self.block)
+            self.last_img = None
+            self.block_end = self.nodes + BLOCK_MAX_NODES
+        elif tag == "img":
+            src = attrib.get("src")
+            if src:
+                self.last_img = src
+        elif tag == "a" and self._open() and self.block[2] is None:
+            href = attrib.get("href", "").strip()
+            if href.startswith("http://") or href.startswith("https://"):
+                self.block[2] = href
+
+    def end(self, tag):
+        self._flush()
+        if tag == "h3" and self.open_h3:
+            self._end_h3()
+            self._emit_ready()
+
+    def data(self, data):
+        self.buf.append(data)
+
+    def comment(self, text):
+        # Kommentare zählen wie bei bs4 zum Blocktext, nicht zur Überschrift
+        self._flush()
+        self.nodes += 1
+        if self._open() and text and len(self.block[3]) < BLOCK_MAX_TEXTS:
+            t = text.strip().replace("\xa0", " ")
+            if t:
+                self.block[3].append(t)
+
+    def _end_h3(self):
+        b = self.open_h3.pop()
+        b[0] = " ".join(self.h3_texts[b[0]:])
+        b[4] = True
+        if not self.open_h3:
+            self.h3_texts.clear()
+
+    def close(self):
+        self._flush()
+        while self.open_h3:
+            self._end_h3()
+        self._close_block()
+
+
+class StreamExtractor:
+    """
+    Ereignisbasierte Extraktion über lxml.etree.HTMLParser(target=...).feed():
+    Einträge entstehen, sobald ein h3-Block abgeschlossen ist, ohne dass das
+    ganze Dokument im Speicher liegt. Passt als `sink` für fetch_html.
+
+    Der Zeichensatz kommt aus dem Header oder aus <meta> in den ersten
+    Bytes; ohne brauchbare Angabe UTF-8, falls die ersten Bytes gültiges
+    UTF-8 sind, sonst windows-1252.
+    """
+
+    SNIFF_BYTES = 4096
+
+    def __init__(self, on_entry=None):
+        self.entries = []
+        self.on_entry = on_entry or self.entries.append
+        self.sha256 = hashlib.sha256()
+        self._charset = None
+        self._head = b""
+        self._parser = None
+
+    def _emit(self, heading, logo, link, texts):
+        e = make_entry(heading, logo, link, texts)
+        if e is not None:
+            self.on_entry(e)
+
+    def _start_parser(self):
+        charset = self._charset
+        if not known_codec(charset):
+            charset = EncodingDetector.find_declared_encoding(self._head, is_html=True)
+        if not known_codec(charset):
+            # Wie sniff_encoding, aber nur die ersten Bytes sind bekannt
+            try:
+                codecs.getincrementaldecoder("utf-8")().decode(self._head)
+                charset = "utf-8"
+            except UnicodeDecodeError:
+                charset = "windows-1252"
+        self._parser = lxml.etree.HTMLParser(target=_BlockTarget(self._emit), encoding=charset)
+        if self._head:
+            self._parser.feed(self._head)
+        self._head = b""
+
+    def begin(self, charset: str | None) -> None:
+        self._charset = charset
+
+    def feed(self, chunk: bytes) -> None:
+        self.sha256.update(chunk)
+        if self._parser is None:
+            self._head += chunk
+            if len(self._head) >= self.SNIFF_BYTES:
+                self._start_parser()
+        else:
+            self._parser.feed(chunk)
+
+    def close(self):
+        """Parser abschließen; liefert die gesammelten Einträge (ohne Dedup)."""
+        if self._parser is None:
+            if not self._head:
+                return self.entries
+            self._start_parser()
+        self._parser.close()
+        return self.entries
+
+
+def lxml_heading_text(h) -> str:
+    """Entspricht h.get_text(" ", strip=True) bei bs4."""
+    return " ".join(t.strip() for t in h.itertext() if t.strip())
+
+
+def bs4_heading_text(h) -> str:
+    return h.get_text(" ", strip=True)
+
+
+def page_blocks(html, encoding: str | None = None, parser: str | None = None,
+                positions: list | None = None, ms: dict | None = None):
+    """
+    Blöcke einer Seite plus passende Funktion für den h3-Text, je nach Backend.
+    Für profile_extract: `positions` geht an die Segmentierung, in `ms`
+    landen die Sekunden für "parse" und "segment".
+    """
+    parser = parser or PARSER
+    t0 = time.perf_counter()
+    deadline = t0 + EXTRACT_BUDGET
+    if parser == "lxml":
+        try:
+            root = parse_lxml(html, encoding)
+            if root is None:            # abgebrochener Baum: bs4 übernimmt
+                parser = "bs4"
+        except lxml.etree.ParserError:  # leeres Dokument
+            root = None
+        heading_text = lxml_heading_text
+    if parser != "lxml":
+        if isinstance(html, bytes):
+            root = BeautifulSoup(html, "lxml", from_encoding=encoding)
+        else:
+            root = BeautifulSoup(html, "lxml")
+        heading_text = bs4_heading_text
+    t1 = time.perf_counter()
+    check_budget(deadline, "parsing")
+
+    if root is None:
+        blocks = []
+    elif parser == "lxml":
+        blocks = segment_blocks_lxml(root, positions, deadline)
+    else:
+        blocks = segment_blocks(root, positions, deadline)
+    if ms is not None:
+        ms["parse"] = t1 - t0
+        ms["segment"] = time.perf_counter() - t1
+    return blocks, heading_text
+
+
+def scan_page(html, encoding: str | None = None, parser: str | None = None):
+    """
+    Rohe Einträge einer Seite, ohne Dedup und Sortierung.
+    `html` darf str oder Bytes sein; Bytes gehen ohne Umweg in lxml.
+    `parser` wählt das Backend (Standard: PARSER), beide liefern dieselben
+    Einträge.
+    """
+    blocks, heading_text = page_blocks(html, encoding, parser)
+    entries = []
+    for h, logo_url, link, texts in blocks:
+        e = make_entry(heading_text(h), logo_url, link, texts)
+        if e is not None:
+            entries.append(e)
+    return entries
+
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+_DIGITS = re.compile(r"\d+")
+_MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_PERMS = [
+    (2 * zlib.crc32(f"a{i}".encode()) + 1, zlib.crc32(f"b{i}".encode()))
+    for i in range(NEAR_DUP_BANDS * NEAR_DUP_ROWS)
+]
+
+near_dup_merges = []        # Entscheidungen des letzten dedup_and_sort-Laufs
+
+
+def normalize_domain(url: str | None) -> str | None:
+    """
+    Website-Schlüssel für die Dubletten-Erkennung: der Host ohne "www.",
+    bei SHARED_HOSTS zusätzlich Pfad und Query (facebook.com/a ≠ facebook.com/b).
+    """
+    if not url:
+        return None
+    parts = urlsplit(url)
+    host = (parts.hostname or "").removeprefix("www.")
+    if host in SHARED_HOSTS:
+        path = parts.path.rstrip("/").lower()
+        return host + path + (f"?{parts.query}" if parts.query else "") if path or parts.query else None
+    return host or None
+
+
+def _name_shingles(compact: str) -> frozenset:
+    if len(compact) < 3:
+        return frozenset((compact,))
+    return frozenset(compact[i:i + 3] for i in range(len(compact) - 2))
+
+
+def _jaccard(a: frozenset, b: frozenset) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def _minhash_bands(shingles: frozenset):
+    hs = [zlib.crc32(s.encode("utf-8")) for s in shingles]
+    sig = [min((a * h + b) % _MINHASH_PRIME for h in hs) for a, b in _MINHASH_PERMS]
+    r = NEAR_DUP_ROWS
+    return [(band, tuple(sig[band * r:(band + 1) * r])) for band in range(NEAR_DUP_BANDS)]
+
+
+def _candidate_pairs(members, shingles):
+    """Kandidatenpaare in einem Block: klein paarweise, groß über LSH-Buckets."""
+    if len(members) <= NEAR_DUP_EXACT_MAX:
+        for x in range(len(members)):
+            for y in range(x + 1, len(members)):
+                yield members[x], members[y]
+        return
+    buckets = {}
+    for i in members:
+        for key in _minhash_bands(shingles[i]):
+            buckets.setdefault(key, []).append(i)
+    seen = set()
+    for bucket in buckets.values():
+        for x in range(len(bucket)):
+            for y in range(x + 1, len(bucket)):
+                pair = (bucket[x], bucket[y])
+                if pair not in seen:
+                    seen.add(pair)
+                    yield pair
+
+
+def merge_near_duplicates(entries, merge: bool | None = None):
+    """
+    Findet Einträge mit gleicher Domain (normalize_domain) und gleichen Zahlen
+    im Namen, deren Namen (ohne Satzzeichen/Leerzeichen) eine Trigramm-Jaccard
+    >= NEAR_DUP_THRESHOLD haben; ohne gemeinsame Domain nur bei identischem kompaktem Namen
+    (z.B. "Muster GmbH" / "Muster G.m.b.H." ohne URL). Unterschiedliche Logos
+    trennen immer. Verglichen wird nur innerhalb von
+    Blöcken (gleiche Domain bzw. gleicher Namensanfang), große Blöcke über
+    MinHash-LSH – damit bleibt es auch bei 100k+ Einträgen etwa linear.
+
+    Jede Gruppe landet in near_dup_merges. Nur mit `merge` (Standard:
+    NEAR_DUP_MERGE) wird zusammengeführt: pro Gruppe bleibt der Eintrag mit
+    den meisten Angaben, Lücken werden aus den übrigen gefüllt.
+    """
+    merge = NEAR_DUP_MERGE if merge is None else merge
+    compact = [_NON_ALNUM.sub("", e.sort) for e in entries]
+    domains = [normalize_domain(e.url) for e in entries]
+    shingles = [_name_shingles(c) for c in compact]
+
+    by_domain = {}
+    by_prefix = {}
+    for i, (c, d) in enumerate(zip(compact, domains)):
+        if d:
+            # Zahlen im Namen ("Filiale 7" / "Filiale 17") müssen übereinstimmen
+            by_domain.setdefault((d, tuple(_DIGITS.findall(c))), []).append(i)
+        by_prefix.setdefault(c[:NEAR_DUP_PREFIX], []).append(i)
+
+    def candidates():
+        # Gleiche Domain: ähnliche Namen, große Blöcke über LSH
+        for members in by_domain.values():
+            if len(members) > 1:
+                yield from _candidate_pairs(members, shingles)
+        # Gleicher Namensanfang: ohne gemeinsame Domain zählt nur Gleichheit,
+        # also innerhalb des Blocks nach kompaktem Namen gruppieren
+        for members in by_prefix.values():
+            if len(members) > 1:
+                same = {}
+                for i in members:
+                    same.setdefault(compact[i], []).append(i)
+                for group in same.values():
+                    for j in group[1:]:
+                        yield group[0], j
+
+    parent = list(range(len(entries)))
+    group_domain = list(domains)    # Domain der Gruppe, gültig an der Wurzel
+    group_logo = [e.logo for e in entries]
+    score = {}                      # zusammengeführter Index -> Jaccard
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in candidates():
+        ri, rj = find(i), find(j)
+        if ri == rj:
+            continue
+        # Auch über Umwege nie zwei verschiedene Domains vereinen
+        di, dj = group_domain[ri], group_domain[rj]
+        if di and dj and di != dj:
+            continue
+        # Verschiedene Logos = verschiedene Unterstützer (z.B. zwei "Huber KG")
+        li, lj = group_logo[ri], group_logo[rj]
+        if li and lj and li != lj:
+            continue
+        # Ähnlich reicht nur bei gleicher Domain, sonst muss der kompakte Name gleich sein
+        same_site = domains[i] is not None and domains[i] == domains[j]
+        jac = _jaccard(shingles[i], shingles[j])
+        if jac >= (NEAR_DUP_THRESHOLD if same_site else 1.0):
+            root, child = min(ri, rj), max(ri, rj)
+            parent[child] = root
+            group_domain[root] = di or dj
+            group_logo[root] = li or lj
+            score[i] = max(score.get(i, 0.0), jac)
+            score[j] = max(score.get(j, 0.0), jac)
+
+    if not score:
+        return entries
+
+    groups = {}
+    for i in range(len(entries)):
+        groups.setdefault(find(i), []).append(i)
+
+    def richness(i):
+        e = entries[i]
+        return (bool(e.branche) + bool(e.url) + bool(e.logo), -i)
+
+    result = list(entries)
+    keep = []
+    for members in groups.values():
+        best = max(members, key=richness)
+        keep.append(best)
+        if len(members) == 1:
+            continue
+        kept = result[best]
+        fill = {}
+        for i in members:
+            if i == best:
+                continue
+            # Fehlende Angaben vom verworfenen Eintrag übernehmen
+            for field in ("branche", "url", "logo"):
+                if getattr(kept, field) is None and fill.get(field) is None:
+                    fill[field] = getattr(entries[i], field)
+            near_dup_merges.append({
+                "kept": kept.name,
+                "dropped": entries[i].name,
+                "domain": domains[i] or domains[best],
+                "jaccard": round(score.get(i, score.get(best, 0.0)), 3),
+                "merged": merge,
+            })
+        if merge and any(v is not None for v in fill.values()):
+            result[best] = replace(kept, **{k: v for k, v in fill.items() if v is not None})
+    if not merge:
+        return entries
+    return [result[i] for i in sorted(keep)]
+
+
+def entry_order(e: Entry):
+    """Sortierschlüssel: sort-Key, bei Gleichstand die übrigen Felder (totale Ordnung)."""
+    return (e.sort, e.name, e.url or "", e.logo or "")
+
+
+# Was einen Eintrag ausmacht; Änderungen daran sind Entfernen + Hinzufügen.
+# attrgetter statt Lambda: läuft in C, zählt bei 1M Einträgen im Diff.
+entry_identity = attrgetter("name", "url", "logo")
+entry_fields = attrgetter("name", "branche", "url", "logo", "sort")
+
+
+def dedup_entries(entries):
     seen = set()
     uniq = []
     for e in entries:
-        key = (e["name"], e["url"], e["logo"])
+        key = entry_identity(e)
         if key not in seen:
             seen.add(key)
             uniq.append(e)
 
-    return sorted(uniq, key=lambda x: x["sort"])
+    near_dup_merges.clear()
+    if NEAR_DUP_ENABLED:
+        uniq = merge_near_duplicates(uniq)
+    return uniq
 
 
-# -----------------------------
-# HTML Output
-# -----------------------------
+def dedup_and_sort(entries):
+    return sorted(dedup_entries(entries), key=entry_order)
 
-def build_html(entries):
-    cards = []
-    for e in entries:
-        name = e["name"]
-        branche_val = e.get("branche") or ""
-        url_val = e.get("url") or ""
-        logo = e.get("logo") or ""
 
-        branche_text = f"Branche: {branche_val}" if branche_val else ""
+entry_diff = {}             # Diff des letzten build()-Laufs (Namen), für den Bericht
+
+
+class SortedStore:
+    """
+    Persistente, nach entry_order sortierte Eintragsliste. apply() gleicht
+    sie mit einer neuen Extraktion ab und pflegt nur die Unterschiede per
+    Binärsuche ein (O(k log n) Vergleiche für k Änderungen) statt alles neu
+    zu sortieren. Bei sehr vielen Änderungen wird einfach neu sortiert.
+    """
+
+    def __init__(self, entries=()):
+        self.entries = list(entries)
+        self.keys = [entry_order(e) for e in self.entries]
+        self.rows = dict(zip(map(entry_fields, self.entries), self.entries))
+
+    @classmethod
+    def load(cls, path: str | None = None) -> "SortedStore":
+        try:
+            with open(path or STORE_FILE, encoding="utf-8") as f:
+                return cls(Entry(*row) for row in json.load(f))
+        except (OSError, ValueError, TypeError):
+            return cls()
+
+    def save(self, path: str | None = None) -> None:
+        path = path or STORE_FILE
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        rows = [e.row() for e in self.entries]
+        _write_atomic(path, json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    def _remove(self, e: Entry) -> None:
+        k = entry_order(e)
+        i = bisect.bisect_left(self.keys, k)
+        del self.keys[i], self.entries[i]
+        del self.rows[entry_fields(e)]
+
+    def _insert(self, e: Entry) -> None:
+        k = entry_order(e)
+        i = bisect.bisect_left(self.keys, k)
+        self.keys.insert(i, k)
+        self.entries.insert(i, e)
+        self.rows[entry_fields(e)] = e
+
+    def apply(self, fresh) -> dict:
+        """
+        Übernimmt die (deduplizierten) Einträge `fresh`. Liefert den Diff
+        {"added": [...], "removed": [...], "changed": [(alt, neu), ...]}.
+        """
+        # Erst über komplette Feld-Tupel abgleichen (Mengenoperationen in C),
+        # dann nur den kleinen Rest nach Identität in geändert/neu/weg teilen.
+        fresh = dict(zip(map(entry_fields, fresh), fresh))
+        gone = [self.rows[f] for f in self.rows.keys() - fresh.keys()]
+        came = {entry_identity(e): e for e in (fresh[f] for f in fresh.keys() - self.rows.keys())}
+        diff = {"added": [], "removed": [], "changed": []}
+        for e in gone:
+            after = came.pop(entry_identity(e), None)
+            if after is None:
+                diff["removed"].append(e)
+            else:
+                diff["changed"].append((e, after))
+        diff["added"] = list(came.values())
+
+        k = len(diff["added"]) + len(diff["removed"]) + len(diff["changed"])
+        if k * 8 > len(self.entries):
+            self.__init__(sorted(fresh.values(), key=entry_order))
+            return diff
+
+        for e in diff["removed"]:
+            self._remove(e)
+        for before, after in diff["changed"]:
+            self._remove(before)
+            self._insert(after)
+        for e in diff["added"]:
+            self._insert(e)
+        return diff
+
+
+def _parse_cache_path(html, encoding: str | None) -> str:
+    data = html if isinstance(html, bytes) else html.encode("utf-8")
+    h = hashlib.sha256(data)
+    h.update(f"|{encoding}|{EXTRACT_FINGERPRINT}|{isinstance(html, bytes)}".encode("ascii"))
+    return os.path.join(PARSE_CACHE_DIR, h.hexdigest() + ".json")
+
+
+def scan_page_cached(html, encoding: str | None = None, parser: str | None = None):
+    """
+    scan_page mit Ergebnis-Cache: gleiches HTML (z.B. CI-Retry, neues
+    Template) lädt die Einträge aus einer kompakten JSON-Datei statt neu zu
+    parsen. Bei einem Fehlschlag wird blockweise inkrementell extrahiert
+    (scan_page_incremental, mit dem gewählten Backend); beide Backends
+    liefern dasselbe, daher zählt der Parser für den Cache nicht.
+    """
+    if not PARSE_CACHE_ENABLED:
+        return scan_page(html, encoding, parser)
+
+    entries = _parse_cache_get(html, encoding)
+    if entries is None:
+        entries = scan_page_incremental(html, encoding, parser)
+        _parse_cache_put(html, encoding, entries)
+    return entries
+
+
+def _parse_cache_get(html, encoding: str | None):
+    path = _parse_cache_path(html, encoding)
+    try:
+        with open(path, encoding="utf-8") as f:
+            rows = json.load(f)
+        os.utime(path)
+        return [Entry(*row) for row in rows]
+    except (OSError, ValueError):
+        return None
+
+
+def _parse_cache_put(html, encoding: str | None, entries) -> None:
+    os.makedirs(PARSE_CACHE_DIR, exist_ok=True)
+    rows = [e.row() for e in entries]
+    _write_atomic(_parse_cache_path(html, encoding),
+                  json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    _prune_parse_cache()
+
+
+def _prune_parse_cache() -> None:
+    try:
+        files = [os.path.join(PARSE_CACHE_DIR, n) for n in os.listdir(PARSE_CACHE_DIR) if n.endswith(".json")]
+        files.sort(key=os.path.getmtime)
+    except OSError:
+        return
+    for path in files[:-PARSE_CACHE_MAX_FILES]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_H3_OPEN = re.compile(rb"<h3(?=[\s/>])", re.IGNORECASE)
+# Ein h3, das nur Text, Kommentare und einfaches Inline-Markup enthält und
+# mit </h3> schließt. Alles andere (Tabellen, Blöcke, kaputte Tags, fehlendes
+# </h3>) kann der Parser über den nächsten Schnitt hinaus ausdehnen.
+_H3_CLEAN = re.compile(
+    rb"<h3[^<>]*>(?:[^<>]|<!--(?:(?!-->).)*-->"
+    rb"|</?(?:a|abbr|b|br|em|font|i|img|small|span|strong|sub|sup|u)(?=[\s/>])[^<>]*>)*</h3\s*>",
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+def h3_cuts(body: bytes):
+    """
+    Positionen aller "<h3" im rohen Markup, an denen die Seite für Block-
+    Cache und Parallel-Extraktion geschnitten wird. None, wenn ein h3 nicht
+    sauber vor dem nächsten Schnitt endet – dann hängt sein Text von Markup
+    außerhalb des Ausschnitts ab und die Seite muss am Stück geparst werden.
+    """
+    starts = [m.start() for m in _H3_OPEN.finditer(body)]
+    for start, end in zip(starts, starts[1:] + [len(body)]):
+        if not _H3_CLEAN.match(body, start, end):
+            return None
+    return starts
+
+
+extract_profiles = []       # ein profile_extract-Profil pro Seite, für den Bericht
+_block_cache = None         # fingerprint -> Entry-Zeile oder None, in LRU-Reihenfolge
+block_stats = {"blocks_reused": 0, "blocks_recomputed": 0}
+
+
+def _load_block_cache() -> dict:
+    global _block_cache
+    if _block_cache is None:
+        try:
+            with open(BLOCK_CACHE_FILE, encoding="utf-8") as f:
+                _block_cache = json.load(f)
+        except (OSError, ValueError):
+            _block_cache = {}
+    return _block_cache
+
+
+def _save_block_cache() -> None:
+    cache = _load_block_cache()
+    for key in list(cache)[:max(0, len(cache) - BLOCK_CACHE_MAX)]:
+        del cache[key]
+    os.makedirs(os.path.dirname(BLOCK_CACHE_FILE), exist_ok=True)
+    _write_atomic(BLOCK_CACHE_FILE, json.dumps(cache, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def scan_page_incremental(html, encoding: str | None = None, parser: str | None = None):
+    """
+    Wie scan_page, aber nur für h3-Blöcke mit neuem Fingerprint wird wirklich
+    extrahiert. Das rohe Markup wird an jedem "<h3" geschnitten; der
+    Fingerprint eines Blocks hasht seinen Span plus den vorherigen (dort
+    steht das Logo). Unbekannte Blöcke werden einzeln aus diesem Ausschnitt
+    geparst, bei vielen neuen Blöcken lohnt sich ein Parse der ganzen Seite.
+    Endet ein h3 nicht sauber vor dem nächsten Schnitt (h3_cuts) oder passt
+    die Schnitt-Zahl nicht zu den geparsten h3 (z.B. "<h3" in einem
+    Kommentar), wird die Seite normal extrahiert.
+    """
+    body = html if isinstance(html, bytes) else html.encode("utf-8")
+    encoding = sniff_encoding(body, encoding if isinstance(html, bytes) else "utf-8")
+    starts = h3_cuts(body)
+    if starts is None:
+        return scan_page(body, encoding, parser)
+    if not starts:
+        return []
+
+    salt = f"|{encoding}|{EXTRACT_FINGERPRINT}".encode("ascii")
+    ends = starts[1:] + [len(body)]
+    spans = [(0, starts[0])] + list(zip(starts, ends))
+    keys = []
+    for i in range(1, len(spans)):
+        h = hashlib.sha256()
+        h.update(body[spans[i - 1][0]:spans[i - 1][1]])
+        h.update(b"\0")
+        h.update(body[spans[i][0]:spans[i][1]])
+        h.update(salt)
+        keys.append(h.hexdigest()[:32])
+
+    cache = _load_block_cache()
+    missing = [i for i, k in enumerate(keys) if k not in cache]
+
+    if len(missing) * 2 > len(keys):
+        # Überwiegend neu: einmal komplett parsen, Blöcke 1:1 den Schnitten zuordnen
+        blocks, heading_text = page_blocks(body, encoding, parser)
+        if len(blocks) != len(keys):
+            return scan_page(body, encoding, parser)
+        for i in missing:
+            h, logo, link, texts = blocks[i]
+            e = make_entry(heading_text(h), logo, link, texts)
+            cache[keys[i]] = e.row() if e else None
+    else:
+        for i in missing:
+            fragment = body[spans[i][0]:spans[i + 1][1]]
+            blocks, heading_text = page_blocks(fragment, encoding, parser)
+            if len(blocks) != (1 if i == 0 else 2):
+                return scan_page(body, encoding, parser)
+            h, logo, link, texts = blocks[-1]
+            e = make_entry(heading_text(h), logo, link, texts)
+            cache[keys[i]] = e.row() if e else None
+
+    entries = []
+    for k in keys:
+        row = cache.pop(k)
+        cache[k] = row      # ans Ende: zuletzt benutzt
+        if row is not None:
+            entries.append(Entry(*row))
+
+    block_stats["blocks_reused"] += len(keys) - len(missing)
+    block_stats["blocks_recomputed"] += len(missing)
+    print(f"Blocks: {len(keys) - len(missing)} reused, {len(missing)} recomputed")
+    _save_block_cache()
+    return entries
+
+
+def extract_entries(html, encoding: str | None = None, parser: str | None = None, stats: dict | None = None):
+    """
+    Einträge einer Seite, dedupliziert und sortiert. Mit einem `stats`-Dict
+    wird ohne Caches extrahiert und dort ein Profil abgelegt (siehe
+    profile_extract).
+    """
+    if stats is None:
+        return dedup_and_sort(scan_page_cached(html, encoding, parser))
+    entries, profile = profile_extract(html, encoding, parser)
+    stats.update(profile)
+    return entries
+
+
+def profile_extract(html, encoding: str | None = None, parser: str | None = None):
+    """
+    Extraktion mit Messpunkten, ohne Caches. Liefert (Einträge, Profil):
+
+    - ms: parse, segment, heading, regex (find_branche), entries (make_entry,
+      enthält regex noch einmal), dedup_sort, total
+    - nodes: Knoten insgesamt, vor dem ersten h3 (riesiger Header), nach dem
+      letzten h3 (riesiger Footer)
+    - logo_search / text_walk: Knoten, die pro h3 rückwärts (Logo) bzw.
+      vorwärts (Texte, Link) überstrichen werden – Summe, Maximum und die
+      EXTRACT_STATS_TOP teuersten Überschriften
+
+    Im Single-Pass-Segmentieren ist der Text-Bereich eines h3 zugleich der
+    Logo-Bereich des nächsten; die Zahlen zeigen trotzdem, wo es teuer wird.
+    """
+    parser = parser or PARSER
+    ms = {}
+    t_start = time.perf_counter()
+    positions = []
+    blocks, heading_text = page_blocks(html, encoding, parser, positions, ms)
+
+    t_heading = t_regex = t_entries = 0.0
+    headings, raw = [], []
+    for h, logo_url, link, texts in blocks:
+        t0 = time.perf_counter()
+        heading = heading_text(h)
+        t1 = time.perf_counter()
+        find_branche(texts)
+        t2 = time.perf_counter()
+        e = make_entry(heading, logo_url, link, texts)
+        t3 = time.perf_counter()
+        t_heading += t1 - t0
+        t_regex += t2 - t1
+        t_entries += t3 - t2
+        headings.append(heading)
+        if e is not None:
+            raw.append(e)
+    ms.update(heading=t_heading, regex=t_regex, entries=t_entries)
+
+    t0 = time.perf_counter()
+    entries = dedup_and_sort(raw)
+    ms["dedup_sort"] = time.perf_counter() - t0
+    ms["total"] = time.perf_counter() - t_start
+
+    total = positions[-1] if positions else 0
+    h3 = positions[:-1]
+    back = [b - a for a, b in zip([0] + h3, h3)]
+    fwd = [b - a for a, b in zip(h3, h3[1:] + [total])]
+
+    def walk(counts):
+        top = sorted(zip(counts, headings), reverse=True)[:EXTRACT_STATS_TOP]
+        return {
+            "sum": sum(counts),
+            "max": max(counts, default=0),
+            "top": [{"heading": name, "nodes": c} for c, name in top],
+        }
+
+    profile = {
+        "parser": parser,
+        "bytes": len(html),
+        "blocks": len(blocks),
+        "entries": len(entries),
+        "ms": {k: round(v * 1000, 3) for k, v in ms.items()},
+        "nodes": {
+            "total": total,
+            "before_first_h3": back[0] if back else total,
+            "after_last_h3": fwd[-1] if fwd else 0,
+        },
+        "logo_search": walk(back),
+        "text_walk": walk(fwd),
+    }
+    return entries, profile
+
+
+def _scan_rows(html, encoding: str | None, parser: str | None):
+    """Worker: scan_page, Ergebnis als Zeilen (billig zu picklen)."""
+    return [e.row() for e in scan_page(html, encoding, parser)]
 
-        cards.append(f"""
-        <a class="card"
-           href="{esc_attr(url_val) or '#'}"
-           target="_blank"
-           rel="noopener"
-           data-name="{esc_attr(name)}"
-           data-branche="{esc_attr(branche_val)}"
-           data-url="{esc_attr(url_val)}">
-          <div class="logoWrap">
-            <img src="{esc_attr(logo)}" alt="{esc_attr(name)}" loading="lazy" decoding="async">
-          </div>
-          <div class="name">{esc_attr(name)}</div>
-          <div class="meta">{esc_attr(branche_text)}</div>
-          <div class="url">{esc_attr(url_val)}</div>
-        </a>
-        """)
 
-    return f"""<!doctype html>
+def _scan_range(fragment: bytes, encoding: str, parser: str, expected: int, skip_first: bool):
+    """
+    Worker: einen h3-Bereich extrahieren. Der erste Block ist nur mitgeparst,
+    damit das Logo des nächsten (es steht vor dessen h3) im Ausschnitt liegt.
+    None, wenn die Blockzahl nicht stimmt – dann extrahiert der Aufrufer seriell.
+    """
+    blocks, heading_text = page_blocks(fragment, encoding, parser)
+    if len(blocks) != expected:
+        return None
+    rows = []
+    for h, logo_url, link, texts in blocks[1:] if skip_first else blocks:
+        e = make_entry(heading_text(h), logo_url, link, texts)
+        if e is not None:
+            rows.append(e.row())
+    return rows
+
+
+def h3_ranges(body: bytes, n: int):
+    """
+    Teilt das rohe Markup an "<h3" in höchstens n Bereiche mit etwa gleich
+    vielen Blöcken. Liefert (start, end, Blockzahl, skip_first); jeder Bereich
+    außer dem ersten beginnt einen Block früher (wegen des Logos). None, wenn
+    die Schnitte nicht tragen (siehe h3_cuts).
+    """
+    starts = h3_cuts(body)
+    if starts is None:
+        return None
+    if not starts:
+        return [(0, len(body), 0, False)]
+    n = max(1, min(n, len(starts)))
+    bounds = [len(starts) * i // n for i in range(n + 1)]
+    ranges = []
+    for a, b in zip(bounds, bounds[1:]):
+        start = starts[a - 1] if a else 0
+        end = starts[b] if b < len(starts) else len(body)
+        ranges.append((start, end, b - a + (1 if a else 0), a > 0))
+    return ranges
+
+
+def scan_page_parallel(pool, html, encoding: str | None = None, parser: str | None = None, chunks: int = 1):
+    """scan_page über `chunks` h3-Bereiche verteilt auf den ProcessPoolExecutor `pool`."""
+    parser = parser or PARSER
+    body = html if isinstance(html, bytes) else html.encode("utf-8")
+    encoding = sniff_encoding(body, encoding if isinstance(html, bytes) else "utf-8")
+    ranges = h3_ranges(body, chunks)
+    if ranges is None:
+        return scan_page(body, encoding, parser)
+    futures = [
+        pool.submit(_scan_range, body[start:end], encoding, parser, expected, skip)
+        for start, end, expected, skip in ranges
+    ]
+    parts = [f.result() for f in futures]
+    if any(rows is None for rows in parts):
+        # z.B. "<h3" in Kommentar/Script: Schnitte passen nicht zu den Blöcken
+        return scan_page(body, encoding, parser)
+    return [Entry(*row) for rows in parts for row in rows]
+
+
+def extract_parallel(pages, parser: str | None = None, workers: int = 2):
+    """
+    Extraktion im ProcessPoolExecutor: mehrere Quellen werden je Seite
+    verteilt, eine einzelne Seite in h3-Bereiche geschnitten (mehr Bereiche
+    als Worker, damit die Last sich ausgleicht). Der Ergebnis-Cache gilt wie
+    seriell; der Block-Cache nicht, er ist nicht prozesssicher.
+    """
+    parser = parser or PARSER
+    pages = list(pages)
+    results = [_parse_cache_get(body, enc) if PARSE_CACHE_ENABLED else None for body, enc in pages]
+    todo = [i for i, r in enumerate(results) if r is None]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if len(todo) == 1:
+            i = todo[0]
+            results[i] = scan_page_parallel(pool, *pages[i], parser, chunks=workers * PARALLEL_CHUNKS_PER_WORKER)
+        elif todo:
+            futures = {i: pool.submit(_scan_rows, *pages[i], parser) for i in todo}
+            for i, f in futures.items():
+                results[i] = [Entry(*row) for row in f.result()]
+
+    if PARSE_CACHE_ENABLED:
+        for i in todo:
+            _parse_cache_put(*pages[i], results[i])
+    return [e for entries in results for e in entries]
+
+
+def extract_all(pages, parser: str | None = None, sort: bool = True, workers: int | None = None):
+    """Mehrere Quellen (Liste von (body, charset)) zusammenführen."""
+    workers = workers or EXTRACT_WORKERS
+    if EXTRACT_STATS:
+        entries = []
+        for body, encoding in pages:
+            page_entries, profile = profile_extract(body, encoding, parser)
+            entries.extend(page_entries)
+            extract_profiles.append(profile)
+            ms, nodes = profile["ms"], profile["nodes"]
+            print(f"Extract: {profile['blocks']} blocks, {nodes['total']} nodes "
+                  f"({nodes['before_first_h3']} before first h3, {nodes['after_last_h3']} after last), "
+                  f"parse {ms['parse']:.1f} ms, segment {ms['segment']:.1f} ms, total {ms['total']:.1f} ms")
+    elif workers > 1:
+        entries = extract_parallel(pages, parser, workers)
+    else:
+        entries = []
+        for body, encoding in pages:
+            entries.extend(scan_page_cached(body, encoding, parser))
+    return dedup_and_sort(entries) if sort else dedup_entries(entries)
+
+
+# -----------------------------
+# HTML Output
+# -----------------------------
+
+# Seite als Vorlage: {cards}, {total} und {fold_js} werden ersetzt, CSS/JS
+# stehen mit verdoppelten Klammern wie in einem f-String. Beim Import in
+# statische Stücke zerlegt, sodass build_html nur noch die Karten formatiert
+# und einmal joint.
+_PAGE_TEMPLATE = """<!doctype html>
 <html lang="de">
 <head>
 <meta charset="utf-8">
@@ -296,11 +2088,11 @@ footer {{
   </div>
 
   <div class="grid" id="grid">
-    {''.join(cards)}
+    {cards}
   </div>
 
   <footer>
-    <!--Stand: <span id="ts"></span> · Partner: <strong id="total">{len(entries)}</strong>-->
+    <!--Stand: <span id="ts"></span> · Partner: <strong id="total">{total}</strong>-->
   </footer>
 </div>
 
@@ -317,13 +2109,25 @@ footer {{
   const cards = Array.from(document.querySelectorAll('.card'));
   const countEl = document.getElementById('count');
 
+  // Gleiche Tabelle wie normalize_sort_key in scrape_build.py
+  const FOLD = {fold_js};
+  const FOLD_RE = new RegExp("[" + Object.keys(FOLD).join("") + "]", "g");
+
   function norm(s) {{
     return (s || "")
       .toLowerCase()
-      .trim()
-      .replace(/ä/g,'ae').replace(/ö/g,'oe').replace(/ü/g,'ue').replace(/ß/g,'ss');
+      .replace(FOLD_RE, c => FOLD[c])
+      .replace(/\\s+/g, " ")
+      .trim();
   }}
 
+  // Suchtext pro Karte einmal falten, nicht bei jedem Tastendruck
+  const hays = cards.map(c => norm(
+    (c.dataset.name || "") + " " +
+    (c.dataset.branche || "") + " " +
+    (c.dataset.url || "")
+  ));
+
   function updateCount(visible) {{
     if (!countEl) return;
     countEl.textContent = visible + " / " + cards.length + " angezeigt";
@@ -333,13 +2137,9 @@ footer {{
     const q = norm(input.value);
     let visible = 0;
 
-    for (const c of cards) {{
-      const hay = norm(
-        (c.dataset.name || "") + " " +
-        (c.dataset.branche || "") + " " +
-        (c.dataset.url || "")
-      );
-      const show = !q || hay.includes(q);
+    for (let i = 0; i < cards.length; i++) {{
+      const c = cards[i];
+      const show = !q || hays[i].includes(q);
       c.style.display = show ? "" : "none";
       if (show) visible++;
     }}
@@ -430,21 +2230,262 @@ footer {{
 </html>
 """
 
+_PAGE_HEAD, _rest = _PAGE_TEMPLATE.split("{cards}")
+_PAGE_MID, _PAGE_END = _rest.split("{total}")
+_PAGE_HEAD = _PAGE_HEAD.format()
+_PAGE_MID = _PAGE_MID.format()
+_PAGE_END = _PAGE_END.format(fold_js=json.dumps(FOLD_MAP))
+del _rest
+
+
+def render_card(e: Entry) -> str:
+    """Eine Karte; jedes Feld wird genau einmal escaped."""
+    name = esc_attr(e.name)
+    branche = esc_attr(e.branche) if e.branche else ""
+    url = esc_attr(e.url) if e.url else ""
+    logo = esc_attr(e.logo) if e.logo else ""
+    meta = "Branche: " + branche if branche else ""
+    return f"""
+        <a class="card"
+           href="{url or '#'}"
+           target="_blank"
+           rel="noopener"
+           data-name="{name}"
+           data-branche="{branche}"
+           data-url="{url}">
+          <div class="logoWrap">
+            <img src="{logo}" alt="{name}" loading="lazy" decoding="async">
+          </div>
+          <div class="name">{name}</div>
+          <div class="meta">{meta}</div>
+          <div class="url">{url}</div>
+        </a>
+        """
+
+
+def render_html(entries):
+    """Die Seite als Folge von Stücken: Kopf, eine pro Karte, Schluss."""
+    yield _PAGE_HEAD
+    n = 0
+    for e in entries:
+        yield render_card(e)
+        n += 1
+    yield _PAGE_MID
+    yield str(n)
+    yield _PAGE_END
+
+
+def build_html(entries) -> str:
+    return "".join(render_html(entries))
+
+
+def write_html(entries, path: str | None = None) -> None:
+    """
+    Schreibt render_html Stück für Stück durch eine gepufferte Datei, der
+    Speicher wächst also nicht mit der Zahl der Karten. Erst in eine
+    temporäre Datei, damit nie eine halbe Seite ausgeliefert wird.
+    """
+    path = path or OUT_FILE
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8", buffering=HTML_WRITE_BUFFER) as f:
+        f.writelines(render_html(entries))
+    os.replace(tmp, path)
+
 
 # -----------------------------
 # Main
 # -----------------------------
 
 def ensure_dist():
-    import os
     os.makedirs(OUT_DIR, exist_ok=True)
 
 
-def main():
-    html = fetch_html(SOURCE_URL)
-    entries = extract_entries(html)
+def parse_args(argv=None):
+    p = argparse.ArgumentParser(description="Unterstützer-Seite scrapen und dist/index.html bauen.")
+    p.add_argument("--record", metavar="DIR", help="alle Antworten als Fixture-Bundle nach DIR schreiben")
+    p.add_argument("--replay", metavar="DIR", help="Fixture-Bundle aus DIR über einen lokalen Server abspielen")
+    p.add_argument("--latency", type=float, default=0.0, metavar="MS", help="Replay: Verzögerung pro Antwort in ms")
+    p.add_argument("--bandwidth", type=float, default=0.0, metavar="KBPS",
+                   help="Replay: Bandbreite in KiB/s (0 = unbegrenzt)")
+    p.add_argument("--parser", choices=PARSERS, default=PARSER, help="Extraktions-Backend")
+    p.add_argument("--workers", type=int, default=EXTRACT_WORKERS, metavar="N",
+                   help="Extraktion auf N Prozesse verteilen (1 = seriell)")
+    p.add_argument("--extract-stats", action="store_true", default=EXTRACT_STATS,
+                   help="Phasenzeiten und Knotenzahlen der Extraktion in den Bericht schreiben")
+    p.add_argument("--stream", action="store_true",
+                   help="Seiten schon während des Downloads parsen (konstanter Speicher)")
+    p.add_argument("--report", default=REPORT_FILE, metavar="PATH", help="JSON-Bericht über den Lauf")
+    p.add_argument("--crawl", action="store_true", help="Pagination-/Kategorie-Links unter BASE folgen")
+    p.add_argument("--crawl-pattern", default=CRAWL_PATTERN, metavar="REGEX", help="welche Links verfolgt werden")
+    p.add_argument("--crawl-max-pages", type=int, default=CRAWL_MAX_PAGES, metavar="N")
+    p.add_argument("--crawl-rate", type=float, default=CRAWL_RATE, metavar="RPS", help="max. Requests pro Sekunde")
+    args = p.parse_args(argv)
+    if args.stream and args.crawl:
+        p.error("--stream und --crawl lassen sich nicht kombinieren (Crawl braucht den ganzen Body für Links)")
+    return args
+
+
+def use_cache_dir(root: str) -> None:
+    """
+    Alle Cache- und Zustandsdateien und die erzeugte Seite unter `root`
+    statt .cache bzw. dist ablegen.
+    """
+    global CACHE_DIR, STATE_FILE, STORE_FILE, BLOCK_CACHE_FILE, PARSE_CACHE_DIR, HTTP_CACHE_DIR, OUT_DIR, OUT_FILE
+    CACHE_DIR = root
+    STATE_FILE = os.path.join(root, "state.json")
+    STORE_FILE = os.path.join(root, "store.json")
+    BLOCK_CACHE_FILE = os.path.join(root, "blocks.json")
+    PARSE_CACHE_DIR = os.path.join(root, "entries")
+    HTTP_CACHE_DIR = os.path.join(root, "http")
+    OUT_DIR = os.path.join(root, "dist")
+    OUT_FILE = os.path.join(OUT_DIR, "index.html")
+
+
+def main(argv=None):
+    global HTTP_CACHE_TTL, PARSER, EXTRACT_WORKERS, EXTRACT_STATS
+    args = parse_args(argv)
+    PARSER = args.parser
+    EXTRACT_WORKERS = max(1, args.workers)
+    EXTRACT_STATS = args.extract_stats
+    t_start = time.perf_counter()
+
+    if args.record or args.replay:
+        # Aufnahme und Messung sollen echte Antworten sehen, nicht den Disk-Cache;
+        # Zustand, Store, Caches und dist/index.html der echten Läufe bleiben
+        # unangetastet (sonst hielte der nächste echte Lauf die Replay-Seite
+        # wegen unveränderter Quelle für aktuell)
+        HTTP_CACHE_TTL = 0
+        use_cache_dir(OFFLINE_CACHE_DIR)
+    if args.record:
+        start_recording()
+    if args.replay:
+        base = start_replay_server(
+            args.replay,
+            latency=args.latency / 1000,
+            bandwidth=int(args.bandwidth * 1024) or None,
+        )
+        print(f"Replaying {args.replay} via {base}")
+
+    # Aufnahme/Replay immer vollständig: kein 304, kein Hash-Kurzschluss
+    state = {} if (args.record or args.replay) else load_state()
+    crawl_opts = None
+    if args.crawl:
+        crawl_opts = {"pattern": args.crawl_pattern, "max_pages": args.crawl_max_pages, "rate": args.crawl_rate}
+    try:
+        build(state, crawl_opts, stream=args.stream)
+    finally:
+        if args.record:
+            save_recording(args.record)
+        duration = time.perf_counter() - t_start
+        net_summary()
+        write_report(args.report, duration_s=round(duration, 3), started_at=time.time() - duration,
+                     extract=block_stats, near_duplicates=near_dup_merges,
+                     diff=entry_diff, extract_profile=extract_profiles)
+    print(f"Done in {duration:.3f}s")
+
+
+def fetch_sources(state: dict):
+    """
+    Lädt SOURCE_URLS mit den gespeicherten Validatoren. Liefert
+    (pages, validators); pages ist None, wenn alle Quellen 304 melden.
+    """
+    # Ohne vorhandenes Artefakt (oder eines aus anderem Build) gibt es nichts,
+    # worauf ein 304 verweisen könnte
+    current = os.path.exists(OUT_FILE) and state.get("build") == BUILD_FINGERPRINT
+    known = state.get("validators", {}) if current else {}
+    validators = {url: dict(known.get(url, {})) for url in SOURCE_URLS}
+    fetched = fetch_many(SOURCE_URLS, validators)
+    if all(r is None for r in fetched):
+        return None, validators
+
+    # Teilweise 304: für diese Quellen fehlt der Body – unbedingt nachladen
+    stale = [url for url, r in zip(SOURCE_URLS, fetched) if r is None]
+    if stale:
+        for url in stale:
+            validators[url].clear()
+        refetched = dict(zip(stale, fetch_many(stale, validators)))
+        fetched = [r if r is not None else refetched[url] for url, r in zip(SOURCE_URLS, fetched)]
+    return fetched, validators
+
+
+def stream_sources(urls):
+    """
+    Lädt und extrahiert alle `urls` parallel im Streaming-Modus: jede Seite
+    wird schon während des Downloads geparst. Liefert (rohe Einträge,
+    Quell-Hash wie bei source_digest).
+    """
+    def one(url):
+        sx = StreamExtractor()
+        fetch_html(url, sink=sx)
+        return sx.close(), sx.sha256.digest()
+
+    with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as ex:
+        results = list(ex.map(one, urls))
+
+    h = hashlib.sha256(BUILD_FINGERPRINT.encode("ascii"))
+    entries = []
+    for page_entries, digest in results:
+        entries.extend(page_entries)
+        h.update(digest)
+    return entries, h.hexdigest()
+
+
+def source_digest(pages) -> str:
+    """Hash über alle Bodies plus BUILD_FINGERPRINT (neues Skript = neuer Build)."""
+    h = hashlib.sha256(BUILD_FINGERPRINT.encode("ascii"))
+    for body, _ in pages:
+        h.update(hashlib.sha256(body).digest())
+    return h.hexdigest()
+
+
+def build(state: dict, crawl_opts: dict | None = None, stream: bool = False) -> None:
+    _latency.update(state.get("latency", {}))
+    fetched = None
+    if stream:
+        validators = {}
+        raw_entries, source_hash = stream_sources(SOURCE_URLS)
+    elif crawl_opts is not None:
+        # Beim Crawlen braucht jede Seite ihren Body (für die Links) – kein 304
+        validators = {}
+        fetched = [result for _, result in crawl(SOURCE_URLS, **crawl_opts)]
+    else:
+        fetched, validators = fetch_sources(state)
+        if fetched is None:
+            print(f"OK: sources not modified (304), keeping {OUT_FILE}")
+            state["latency"] = _latency
+            save_state(state)
+            set_output("changed", "false")
+            return
+
+    # Viele Server ignorieren Conditional GETs – daher zusätzlich Inhalt vergleichen
+    if fetched is not None:
+        source_hash = source_digest(fetched)
+    if source_hash == state.get("source_sha256") and os.path.exists(OUT_FILE):
+        print(f"OK: source unchanged (sha256 {source_hash[:12]}), keeping {OUT_FILE}")
+        state["validators"] = validators
+        state["latency"] = _latency
+        save_state(state)
+        set_output("changed", "false")
+        return
+
+    fresh = extract_all(fetched, sort=False) if fetched is not None else dedup_entries(raw_entries)
+    store = SortedStore.load()
+    diff = store.apply(fresh)
+    entries = store.entries
+    print(f"Changes: +{len(diff['added'])} -{len(diff['removed'])} ~{len(diff['changed'])}")
+    entry_diff.update(
+        added=[e.name for e in diff["added"]],
+        removed=[e.name for e in diff["removed"]],
+        changed=[after.name for _, after in diff["changed"]],
+    )
+
+    if near_dup_merges:
+        verb = "merged" if NEAR_DUP_MERGE else "found (not merged, SCRAPER_NEAR_DUP_MERGE=1 to merge)"
+        print(f"Near-duplicates {verb}: {len(near_dup_merges)}")
+        for m in near_dup_merges[:10]:
+            print(f"  {m['dropped']!r} -> {m['kept']!r} ({m['domain'] or 'ohne Domain'}, J={m['jaccard']})")
 
-    missing = [e["name"] for e in entries if not e.get("branche")]
+    missing = [e.name for e in entries if not e.branche]
     print("Missing branche count:", len(missing))
     print("First missing:", missing[:10])
 
@@ -452,8 +2493,15 @@ def main():
         raise SystemExit("Extraction looks wrong – aborting.")
 
     ensure_dist()
-    with open(OUT_FILE, "w", encoding="utf-8") as f:
-        f.write(build_html(entries))
+    write_html(entries)
+
+    store.save()
+    state["validators"] = validators
+    state["source_sha256"] = source_hash
+    state["build"] = BUILD_FINGERPRINT
+    state["latency"] = _latency
+    save_state(state)
+    set_output("changed", "true")
 
     print(f"OK: wrote {OUT_FILE} with {len(entries)} entries")
 